@@ -7,6 +7,11 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 from app.models import load_all_models
+from app.models.types import (
+    DifferedULIDType,
+    UserDefinedULIDType,
+    is_ulid_server_default,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -30,6 +35,15 @@ target_metadata = meta
 config.set_main_option("sqlalchemy.url", str(settings.DATABASE_URL))
 
 
+def render_item(type_, obj, autogen_context):
+    """Render ULID columns in `ulid` storage, whatever `ULID_STORAGE` is."""
+    if type_ == "type" and isinstance(obj, (UserDefinedULIDType, DifferedULIDType)):
+        return "app.models.types.ULIDType()"
+    if type_ == "server_default" and is_ulid_server_default(obj):
+        return 'sa.text("gen_ulid()")'
+    return False
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -54,6 +68,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_item=render_item,
     )
 
     with context.begin_transaction():
@@ -61,7 +76,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_item=render_item,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,87 @@
+"""character_soft_delete
+
+Revision ID: d2b7e4a91c3f
+Revises: 7c1e9a4f2b3d
+Create Date: 2025-05-20 10:05:41.208337
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+import app.models.types
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2b7e4a91c3f"
+down_revision: Union[str, None] = "7c1e9a4f2b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "character",
+        sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+    # Names only need to be unique among live characters.
+    op.drop_constraint(op.f("character_name_key"), "character", type_="unique")
+    op.create_index(
+        op.f("character_name_key"),
+        "character",
+        ["name"],
+        unique=True,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        op.f("character_id_live_idx"),
+        "character",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        op.f("character_deleted_at_idx"),
+        "character",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+    # Purging a character takes its dispositions with it.
+    op.drop_constraint(
+        op.f("disposition_character_id_character_fkey"),
+        "disposition",
+        type_="foreignkey",
+    )
+    op.create_foreign_key(
+        op.f("disposition_character_id_character_fkey"),
+        "disposition",
+        "character",
+        ["character_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    # Tombstones would collide with live names under the plain constraint;
+    # purge them (and their dispositions) while the FK still cascades.
+    op.execute("DELETE FROM character WHERE deleted_at IS NOT NULL")
+    op.drop_constraint(
+        op.f("disposition_character_id_character_fkey"),
+        "disposition",
+        type_="foreignkey",
+    )
+    op.create_foreign_key(
+        op.f("disposition_character_id_character_fkey"),
+        "disposition",
+        "character",
+        ["character_id"],
+        ["id"],
+    )
+    op.drop_index(op.f("character_deleted_at_idx"), table_name="character")
+    op.drop_index(op.f("character_id_live_idx"), table_name="character")
+    op.drop_index(op.f("character_name_key"), table_name="character")
+    op.create_unique_constraint(op.f("character_name_key"), "character", ["name"])
+    op.drop_column("character", "deleted_at")
@@ -0,0 +1,73 @@
+"""character_search
+
+Revision ID: e8c3a6f0b1d4
+Revises: d2b7e4a91c3f
+Create Date: 2025-05-27 14:40:09.731552
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+import app.models.types
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8c3a6f0b1d4"
+down_revision: Union[str, None] = "d2b7e4a91c3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    op.add_column(
+        "character",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(name, '')), 'A')"
+                " || setweight(to_tsvector('simple',"
+                " coalesce(default_outfit, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        op.f("character_search_vector_idx"),
+        "character",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        op.f("character_name_trgm_idx"),
+        "character",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        op.f("character_default_outfit_trgm_idx"),
+        "character",
+        ["default_outfit"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"default_outfit": "gin_trgm_ops"},
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("character_default_outfit_trgm_idx"), table_name="character")
+    op.drop_index(op.f("character_name_trgm_idx"), table_name="character")
+    op.drop_index(op.f("character_search_vector_idx"), table_name="character")
+    op.drop_column("character", "search_vector")
+    # pg_trgm stays: it may have been there before, or be used by others.
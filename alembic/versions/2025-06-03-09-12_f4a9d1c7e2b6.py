@@ -0,0 +1,36 @@
+"""character_extra_variables_index
+
+Revision ID: f4a9d1c7e2b6
+Revises: e8c3a6f0b1d4
+Create Date: 2025-06-03 09:12:27.604113
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+import app.models.types
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4a9d1c7e2b6"
+down_revision: Union[str, None] = "e8c3a6f0b1d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("character_extra_variables_idx"),
+        "character",
+        ["extra_variables"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"extra_variables": "jsonb_path_ops"},
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("character_extra_variables_idx"), table_name="character")
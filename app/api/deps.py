@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Callable
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -7,10 +7,16 @@ from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, get_read_session_factory
 from app.core.security import ALGORITHM
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/users/login")
 
 # Database dependency
 DB = Annotated[AsyncSession, Depends(get_db)]
+# Reads from a replica whatever the method, see `app.core.replicas`
+DB_ReadOnly = Annotated[AsyncSession, Depends(get_read_db)]
+# Opens sessions of its own, for streaming responses
+ReadSessionFactory = Annotated[
+    Callable[[], AsyncSession], Depends(get_read_session_factory)
+]
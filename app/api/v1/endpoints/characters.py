@@ -1,29 +1,54 @@
-from typing import Annotated, Any, List, Optional
+import json
+from datetime import datetime
+from functools import cached_property
+from typing import Annotated, Any, Dict, Hashable, List, Literal, Optional, Sequence
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.params import Path, Query
+from fastapi.responses import StreamingResponse
 from fastapi_filter import FilterDepends, with_prefix
 from fastapi_filter.contrib.sqlalchemy import Filter
-from fastapi_pagination.cursor import CursorPage
-from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination.links import Page
+from fastapi_pagination import resolve_params
 from loguru import logger
-from pydantic import Field
+from pydantic import Field, field_validator
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.sql.base import ExecutableOption
 from ulid import ULID as _python_ULID
 
-from app.api.deps import DB
+from app.api.deps import DB, DB_ReadOnly, ReadSessionFactory
+from app.core.config import settings
+from app.core.responses import ModelResponse
+from app.crud.base import DuplicateRecordError
 from app.crud.character import character_crud
 from app.models.character import Character as CharacterModel
+from app.schemas.bulk import BulkDeleteResult, BulkResult
 from app.schemas.character import (
     Character,
+    CharacterBatch,
+    CharacterBatchGet,
     CharacterCreate,
     CharacterUpdate,
 )
+from app.schemas.pagination import CountMode, CountedPage, KeysetPage
 from app.schemas.ulid import ULID as _pydantic_ULID
+from app.utils.export import csv_header, to_csv, to_ndjson
+from app.utils.http import (
+    etag_versions,
+    is_not_modified,
+    list_etag,
+    make_etag,
+    validator_headers,
+)
 
 
 class CharacterFilter(Filter):
     name: Optional[str] = None
+    created_after: Optional[datetime] = Field(
+        None, description="Created at or after (ULID time, inclusive)"
+    )
+    created_before: Optional[datetime] = Field(
+        None, description="Created before (ULID time, exclusive)"
+    )
     custom_order_by: Optional[list[str]] = Field(
         Query(
             None,
@@ -32,12 +57,193 @@ class CharacterFilter(Filter):
         ),
     )
     custom_search: Optional[str] = None
+    extra_contains: Optional[str] = Field(
+        None,
+        description='JSON that `extra_variables` contains, e.g. `{"mood": "calm"}`',
+    )
+    extra_has_keys: Optional[str] = Field(
+        None, description="Comma-separated top-level keys of `extra_variables`"
+    )
+    extra_path: Optional[str] = Field(
+        None,
+        description="`dotted.path=<JSON>`: value at a key path of `extra_variables`;"
+        " a value that is not JSON is taken as a string",
+        example="profile.age=30",
+    )
 
     class Constants(Filter.Constants):
         model = CharacterModel
         ordering_field_name = "custom_order_by"
         search_field_name = "custom_search"
-        search_model_fields = ["name", "default_outfit"]
+        created_range_fields = ("created_after", "created_before")
+        # Served by the `jsonb_path_ops` index, see `CRUDBase.where_jsonb`.
+        extra_fields = ("extra_contains", "extra_has_keys", "extra_path")
+
+    @field_validator("custom_search")
+    @classmethod
+    def check_custom_search(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None and not v.strip():
+            raise ValueError("Expected a search term")
+        return v
+
+    @field_validator("extra_has_keys")
+    @classmethod
+    def check_extra_has_keys(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None and not any(key.strip() for key in v.split(",")):
+            raise ValueError("Expected comma-separated keys")
+        return v
+
+    @field_validator("extra_contains")
+    @classmethod
+    def check_extra_contains(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            json.loads(v)
+        return v
+
+    @field_validator("extra_path")
+    @classmethod
+    def check_extra_path(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            path, sep, _ = v.partition("=")
+            if not sep or not all(path.split(".")):
+                raise ValueError("Expected `dotted.path=<JSON>`")
+        return v
+
+    def _plain_fields(self):
+        return [
+            (k, v)
+            for k, v in super().filtering_fields
+            if k not in self.Constants.created_range_fields
+            and k not in self.Constants.extra_fields
+            and k != self.Constants.search_field_name
+        ]
+
+    @property
+    def filtering_fields(self):
+        # Bound by field name, like every value `filter` binds; see `params`.
+        return [(k, bindparam(k, v)) for k, v in self._plain_fields()]
+
+    def _extra_contains(self):
+        return None if self.extra_contains is None else json.loads(self.extra_contains)
+
+    def _extra_has_keys(self):
+        return [
+            key.strip() for key in (self.extra_has_keys or "").split(",") if key.strip()
+        ]
+
+    def _extra_path_equals(self):
+        if self.extra_path is None:
+            return None
+        path, _, raw = self.extra_path.partition("=")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        return path.split("."), value
+
+    def filter(self, query):
+        query = super().filter(query)
+        if self.custom_search:
+            query = character_crud.where_search(
+                query, self.custom_search, engine=settings.SEARCH_ENGINE
+            )
+        query = character_crud.where_jsonb(
+            query,
+            CharacterModel.extra_variables,
+            contains=self._extra_contains(),
+            has_keys=self._extra_has_keys(),
+            path_equals=self._extra_path_equals(),
+        )
+        # Served by the ULID primary key, see `CRUDBase.where_created`.
+        return character_crud.where_created(
+            query,
+            created_after=self.created_after,
+            created_before=self.created_before,
+        )
+
+    def sort(self, query):
+        if self.custom_search and not self.ordering_values:
+            rank = character_crud.search_rank(
+                self.custom_search, engine=settings.SEARCH_ENGINE
+            )
+            if rank is not None:
+                return query.order_by(rank.desc(), CharacterModel.id)
+        return super().sort(query)
+
+    @cached_property
+    def params(self) -> Dict[str, Any]:
+        """
+        Values of the bind parameters `filter` and `sort` build, by name.
+        """
+        params = dict(self._plain_fields())
+        if self.custom_search:
+            params.update(
+                character_crud.search_params(
+                    self.custom_search, engine=settings.SEARCH_ENGINE
+                )
+            )
+        params.update(
+            character_crud.jsonb_params(
+                CharacterModel.extra_variables,
+                contains=self._extra_contains(),
+                has_keys=self._extra_has_keys(),
+                path_equals=self._extra_path_equals(),
+            )
+        )
+        params.update(
+            character_crud.created_params(
+                created_after=self.created_after, created_before=self.created_before
+            )
+        )
+        return params
+
+    @cached_property
+    def shape(self) -> Hashable:
+        """
+        What `filter` and `sort` build, less the values: the bind parameter
+        names tell which filters are set, and how, and the ordering the rest.
+        """
+        return tuple(sorted(self.params)), tuple(self.ordering_values or ())
+
+    def statement(self, *, ordered: bool = True) -> Select:
+        """
+        Characters, filtered and, if `ordered`, sorted; one statement per
+        `shape`, to execute with `params`. See `app.crud.statements`.
+        """
+
+        def build() -> Select:
+            query = self.filter(select(CharacterModel))
+            return self.sort(query) if ordered else query
+
+        return character_crud.statements.get(
+            ("filter", self.shape, ordered), build, self.params
+        )
+
+
+def include_options(
+    include: Annotated[
+        Optional[str],
+        Query(description="Comma-separated relationships to embed: dispositions"),
+    ] = None,
+) -> Sequence[ExecutableOption]:
+    if not include:
+        return ()
+
+    try:
+        return character_crud.loader_options(
+            [name.strip() for name in include.split(",") if name.strip()]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+
+Include = Annotated[Sequence[ExecutableOption], Depends(include_options)]
+Hard = Annotated[
+    bool, Query(description="Delete permanently instead of leaving a tombstone")
+]
 
 
 router = APIRouter()
@@ -47,40 +253,142 @@ router = APIRouter()
 async def read_characters_page(
     *,
     filter: CharacterFilter = FilterDepends(CharacterFilter),
+    count: Annotated[
+        Optional[CountMode],
+        Query(
+            description="How `total` is counted: exact, estimated, cached or none "
+            "(no total, only `has_next`)"
+        ),
+    ] = None,
+    include: Include,
     db: DB,
-) -> Page[Character]:
+    request: Request,
+) -> CountedPage[Character]:
     """
     Retrieve characters.
     """
-    import sqlalchemy as sa
+    count = count or settings.PAGINATION_COUNT_MODE
+    params = resolve_params()
 
-    query = sa.select(CharacterModel)
-    query = filter.filter(query)
-    query = filter.sort(query)
-    query = filter.sort(query)
+    result = await character_crud.get_page(
+        db,
+        query=filter.statement(),
+        params=filter.params,
+        shape=filter.shape,
+        page=params.page,
+        size=params.size,
+        count=count,
+        options=include,
+    )
+    characters = CountedPage[Character].create(
+        result.items,
+        params,
+        total=result.total,
+        has_next=result.has_next,
+        count_mode=count,
+    )
 
-    characters = await paginate(db, query)
-    return characters
+    headers = {}
+    # Relationship changes do not bump `updated_at`; only plain rows validate.
+    if not include:
+        etag = list_etag(
+            characters.items, characters.total, characters.page, characters.size
+        )
+        # Deletions do not move Last-Modified, so only the ETag is validated.
+        last_modified = max((c.updated_at for c in characters.items), default=None)
+        headers = validator_headers(etag, last_modified)
+        if is_not_modified(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ModelResponse(characters, headers=headers)
 
 
 @router.get("/cursor")
 async def read_characters_cursor(
     *,
     filter: CharacterFilter = FilterDepends(CharacterFilter),
+    cursor: Annotated[
+        Optional[str], Query(description="Cursor for the next page")
+    ] = None,
+    size: Annotated[int, Query(ge=1, le=100, description="Page size")] = 50,
+    include: Include,
     db: DB,
-) -> CursorPage[Character]:
+    request: Request,
+) -> KeysetPage[Character]:
     """
-    Retrieve characters.
+    Retrieve characters with keyset pagination.
     """
-    import sqlalchemy as sa
+    try:
+        page = await character_crud.get_multi_keyset(
+            db,
+            query=filter.statement(ordered=False),
+            params=filter.params,
+            shape=filter.shape,
+            order_by=filter.custom_order_by,
+            cursor=cursor,
+            size=size,
+            options=include,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+    headers = {}
+    if not include:
+        etag = list_etag(page.items, page.next_cursor, page.previous_cursor)
+        headers = validator_headers(etag)
+        if is_not_modified(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return ModelResponse(
+        KeysetPage[Character](
+            items=page.items,
+            current_page=cursor,
+            next_page=page.next_cursor,
+            previous_page=page.previous_cursor,
+        ),
+        headers=headers,
+    )
+
 
-    query = sa.select(CharacterModel)
+@router.get("/export")
+async def export_characters(
+    *,
+    session_factory: ReadSessionFactory,
+    filter: CharacterFilter = FilterDepends(CharacterFilter),
+    format: Annotated[Literal["ndjson", "csv"], Query()] = "ndjson",
+) -> StreamingResponse:
+    """
+    Stream every matching character as NDJSON or CSV.
+    """
+    query = select(CharacterModel)
     query = filter.filter(query)
-    query = filter.sort(query)
-    query = filter.sort(query)
+    if filter.custom_order_by:
+        query = filter.sort(query)
+    else:
+        query = query.order_by(CharacterModel.id)
 
-    characters = await paginate(db, query)
-    return characters
+    async def _body():
+        # `get_db` is torn down before a streaming body runs, so the export
+        # holds its own session for the lifetime of the server-side cursor.
+        async with session_factory() as session:
+            if format == "csv":
+                yield csv_header(Character)
+            async for partition in character_crud.stream_multi(
+                session, query=query, yield_per=settings.EXPORT_YIELD_PER
+            ):
+                if format == "csv":
+                    yield to_csv(partition, Character)
+                else:
+                    yield to_ndjson(partition, Character)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=characters.{format}"},
+    )
 
 
 @router.post("/", response_model=Character, status_code=status.HTTP_201_CREATED)
@@ -93,15 +401,68 @@ async def create_character(
     Create new character.
     Admin only.
     """
-    character = await character_crud.get_by_name(db, name=character_in.name)
-    if character:
+    try:
+        character = await character_crud.create(db, obj_in=character_in)
+    except DuplicateRecordError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="A character with this name already exists",
+        ) from e
+    return ModelResponse(
+        Character.model_validate(character), status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def create_characters_bulk(
+    *,
+    db: DB,
+    characters_in: List[CharacterCreate],
+    upsert: Annotated[
+        bool, Query(description="Update characters whose name already exists")
+    ] = False,
+    copy: Annotated[
+        bool, Query(description="Load through COPY; any conflict aborts the load")
+    ] = False,
+) -> Any:
+    """
+    Create characters in bulk.
+    Admin only.
+    """
+    if upsert and copy:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="`upsert` and `copy` cannot be combined",
         )
 
-    character = await character_crud.create(db, obj_in=character_in)
-    return character
+    if upsert:
+        return await character_crud.upsert_many(
+            db, objs_in=characters_in, conflict_columns=["name"]
+        )
+    return await character_crud.create_many(db, objs_in=characters_in, use_copy=copy)
+
+
+@router.post("/batch-get", response_model=CharacterBatch)
+async def read_characters_batch(
+    *,
+    db: DB_ReadOnly,
+    batch_in: CharacterBatchGet,
+    include: Include,
+) -> Any:
+    """
+    Get up to 100 characters by ID in one query, in request order.
+    """
+    ids = list(dict.fromkeys(batch_in.ids))
+    characters = await character_crud.get_multi_by_ids(
+        db, ids=ids, limit=len(ids), options=include
+    )
+    found = {character.id: character for character in characters}
+    return ModelResponse(
+        CharacterBatch(
+            items=[found[id] for id in ids if id in found],
+            missing=[id for id in ids if id not in found],
+        )
+    )
 
 
 @router.get("/{character_id}", response_model=Character)
@@ -110,20 +471,43 @@ async def read_character(
     db: DB,
     character_id: _python_ULID = Path(),
     # character_id: str,
+    include: Include,
+    request: Request,
 ) -> Any:
     """
     Get character by ID.
     """
-    logger.debug(f"{type(character_id) = }")
-    logger.debug(f"{repr(character_id) = }")
+    conditional = (
+        "if-none-match" in request.headers or "if-modified-since" in request.headers
+    )
+    if conditional and not include:
+        # Validate against a single-column probe before loading the row.
+        updated_at = await character_crud.get_updated_at(db, id=character_id)
+        if updated_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Character not found",
+            )
+        etag = make_etag(character_id, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers=validator_headers(etag, updated_at),
+            )
+
     # character = await character_crud.get(db, id=_python_ULID.from_str(character_id))
-    character = await character_crud.get(db, id=character_id)
+    character = await character_crud.get(db, id=character_id, options=include)
     if not character:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Character not found",
         )
-    return character
+    headers = {}
+    if not include:
+        headers = validator_headers(
+            make_etag(character.id, character.updated_at), character.updated_at
+        )
+    return ModelResponse(Character.model_validate(character), headers=headers)
 
 
 @router.put("/{character_id}", response_model=Character)
@@ -132,32 +516,47 @@ async def update_character(
     db: DB,
     character_id: Annotated[_python_ULID, Path()],
     character_in: CharacterUpdate,
+    request: Request,
 ) -> Any:
     """
     Update a character.
     Admin only.
+
+    Send `If-Match` with a previously read ETag to reject lost updates.
     """
-    character = await character_crud.get(db, id=character_id)
-    if not character:
+    if_match = request.headers.get("if-match")
+    versions = None
+    if if_match is not None and if_match.strip() != "*":
+        versions = etag_versions(if_match, character_id)
+
+    try:
+        character = await character_crud.update_by_id(
+            db, id=character_id, obj_in=character_in, if_updated_at=versions
+        )
+    except DuplicateRecordError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A character with this name already exists",
+        ) from e
+    if character is None:
+        if versions is not None and (
+            await character_crud.get_updated_at(db, id=character_id) is not None
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Character was modified since it was read",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Character not found",
         )
-
-    logger.info(f"{await character.awaitable_attrs.dispositions = }")
-
-    # Check if name is being updated and if it already exists
-    if character_in.name and character_in.name != character.name:
-        existing = await character_crud.get_by_name(db, name=character_in.name)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="A character with this name already exists",
-            )
-
-    character = await character_crud.update(db, db_obj=character, obj_in=character_in)
-    logger.info(f"{character = }")
-    return character
+    logger.info("Updated character {}", character.id)
+    return ModelResponse(
+        Character.model_validate(character),
+        headers=validator_headers(
+            make_etag(character.id, character.updated_at), character.updated_at
+        ),
+    )
 
 
 @router.delete("/{character_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -165,16 +564,50 @@ async def delete_character(
     *,
     db: DB,
     character_id: Annotated[_python_ULID, Path()],
+    hard: Hard = False,
 ) -> None:
     """
     Delete a character.
     Admin only.
+
+    The character is kept as a tombstone until compaction, unless `hard`.
     """
-    character = await character_crud.get(db, id=character_id)
-    if not character:
+    if not await character_crud.delete(db, id=character_id, soft=not hard):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Character not found",
         )
 
-    await character_crud.delete(db, id=character_id)
+
+@router.delete("/", response_model=BulkDeleteResult)
+async def delete_characters(
+    *,
+    db: DB,
+    ids: Annotated[
+        Optional[List[_python_ULID]],
+        Query(max_length=1000, description="Delete these characters"),
+    ] = None,
+    filter: CharacterFilter = FilterDepends(CharacterFilter),
+    hard: Hard = False,
+) -> Any:
+    """
+    Delete characters by ID or by filter, in a single statement.
+    Admin only.
+
+    At least one of `ids` or a filter is required; both narrow the selection.
+    """
+    criteria = []
+    if ids:
+        criteria.append(character_crud._id_any(ids))
+    # Every filter that restricts anything binds a value; see `params`.
+    if filter.params:
+        criteria.append(CharacterModel.id.in_(filter.filter(select(CharacterModel.id))))
+    if not criteria:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass `ids` or a filter; refusing to delete every character",
+        )
+
+    deleted = await character_crud.delete_where(db, *criteria, soft=not hard)
+    logger.info("Deleted {} characters", deleted)
+    return ModelResponse(BulkDeleteResult(deleted=deleted))
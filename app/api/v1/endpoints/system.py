@@ -0,0 +1,33 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter
+
+from app.core.cache import registered_caches
+from app.core.database import engine, replicas
+from app.schemas.system import CacheStats, PoolStats, ReplicaStats
+
+router = APIRouter()
+
+
+@router.get("/pool", response_model=PoolStats)
+async def read_pool_stats() -> Any:
+    """
+    Connection pool usage: checked-out connections, overflow and checkout wait.
+    """
+    return engine.pool.stats()
+
+
+@router.get("/replicas", response_model=List[ReplicaStats])
+async def read_replica_stats() -> Any:
+    """
+    Read replicas: replication lag, whether reads go there, and reads served.
+    """
+    return replicas.stats()
+
+
+@router.get("/cache", response_model=Dict[str, CacheStats])
+async def read_cache_stats() -> Any:
+    """
+    Read-through cache counters, by table.
+    """
+    return {name: cache.stats() for name, cache in registered_caches().items()}
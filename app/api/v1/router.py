@@ -1,8 +1,9 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import characters
+from app.api.v1.endpoints import characters, system
 
 api_router = APIRouter()
 
 # Include all endpoint routers
 api_router.include_router(characters.router, prefix="/characters", tags=["characters"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
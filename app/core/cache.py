@@ -0,0 +1,193 @@
+"""In-process read-through cache with cross-worker invalidation.
+
+Each worker keeps its own bounded LRU/TTL caches. Writers invalidate locally
+and `pg_notify` the change; the notification is only delivered on commit, and
+`CacheInvalidationListener` drops the entry in every worker, including the
+writer's own, so a stale re-read between invalidation and commit is dropped
+as well. While the listener is disconnected, invalidations from other workers
+are lost, so the caches are bypassed until it is back.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import asyncpg
+from loguru import logger
+from ulid import ULID as _python_ULID
+
+_MISSING = object()
+
+# Caches by table name, for routing invalidation notifications.
+_caches: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        """
+        Bounded LRU cache whose entries also expire `ttl` seconds after insert.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Cleared by `CacheInvalidationListener` while it cannot listen.
+        self.enabled = True
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        if self._data.pop(key, _MISSING) is not _MISSING:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def register_cache(name: str, cache: TTLCache) -> None:
+    _caches[name] = cache
+
+
+def registered_caches() -> Dict[str, TTLCache]:
+    return dict(_caches)
+
+
+def _enable_caches(enabled: bool) -> None:
+    for cache in _caches.values():
+        cache.clear()
+        cache.enabled = enabled
+
+
+# Payload IDs standing for the whole table.
+_EVERY_ID = "*"
+
+
+def invalidation_payload(name: str, ids: Optional[list] = None) -> str:
+    """
+    Notification payload dropping `ids` of table `name`, or all of it if None.
+    """
+    if ids is None:
+        return f"{name}:{_EVERY_ID}"
+    return f"{name}:{','.join(str(id) for id in ids)}"
+
+
+def apply_invalidation(payload: str) -> None:
+    name, _, ids = payload.partition(":")
+    cache = _caches.get(name)
+    if cache is None:
+        return
+    if ids == _EVERY_ID:
+        cache.clear()
+        return
+    for id in filter(None, ids.split(",")):
+        cache.delete(("id", _python_ULID.from_str(id)))
+
+
+class CacheInvalidationListener:
+    """
+    `LISTEN`s on `channel` over a dedicated asyncpg connection (not taken from
+    the pool) and applies invalidations to the registered caches. A lost
+    connection disables the caches and is retried with exponential backoff,
+    up to `max_backoff` seconds apart.
+    """
+
+    def __init__(self, dsn: str, channel: str, *, max_backoff: float = 30.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.max_backoff = max_backoff
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect: Optional[asyncio.Task] = None
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.add_listener(self.channel, self._on_notify)
+        except BaseException:
+            await connection.close()
+            raise
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+
+    async def start(self) -> None:
+        await self._connect()
+
+    async def stop(self) -> None:
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reconnect
+            self._reconnect = None
+        if self._connection is not None:
+            self._connection.remove_termination_listener(self._on_termination)
+            await self._connection.close()
+            self._connection = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        apply_invalidation(payload)
+
+    def _on_termination(self, connection) -> None:
+        # Invalidations are lost from here on; bypass the caches until back.
+        logger.warning("Cache invalidation listener on {} lost", self.channel)
+        self._connection = None
+        _enable_caches(False)
+        self._reconnect = asyncio.create_task(self._run_reconnect())
+
+    async def _run_reconnect(self) -> None:
+        backoff = 0.5
+        while True:
+            await asyncio.sleep(backoff)
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.warning(
+                    "Cache invalidation listener on {} not back: {!r}",
+                    self.channel,
+                    e,
+                )
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            # Missed invalidations only concern entries from before the loss.
+            _enable_caches(True)
+            logger.info("Cache invalidation listener on {} back", self.channel)
+            self._reconnect = None
+            return
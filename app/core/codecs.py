@@ -0,0 +1,75 @@
+"""asyncpg type codecs for the pgx_ulid ``ulid`` column type.
+
+Registering the codec on every pooled connection lets asyncpg move the 16 raw
+bytes of a ULID over the wire and hand back ``ulid.ULID`` objects directly, so
+the SQLAlchemy type processors in ``app.models.types`` become no-ops.
+"""
+
+from typing import Any, Literal
+
+import ulid
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ULID_TYPE_NAME = "ulid"
+
+CodecFormat = Literal["binary", "text"]
+
+
+def encode_ulid_binary(value: Any) -> bytes:
+    if isinstance(value, ulid.ULID):
+        return value.bytes
+    if isinstance(value, str):
+        return ulid.ULID.from_str(value).bytes
+    return bytes(value)
+
+
+def decode_ulid_binary(data: bytes) -> ulid.ULID:
+    return ulid.ULID(data)
+
+
+def encode_ulid_text(value: Any) -> str:
+    return str(value)
+
+
+def decode_ulid_text(data: str) -> ulid.ULID:
+    return ulid.ULID.from_str(data)
+
+
+_CODECS = {
+    "binary": (encode_ulid_binary, decode_ulid_binary),
+    "text": (encode_ulid_text, decode_ulid_text),
+}
+
+
+def register_ulid_codec(
+    engine: AsyncEngine,
+    *,
+    format: CodecFormat = "binary",
+    schema: str = "public",
+) -> None:
+    """
+    Install the ``ulid`` codec on each new asyncpg connection of `engine`.
+
+    The ``ulid`` extension must already exist in the target database, otherwise
+    asyncpg fails to introspect the type when the connection is opened.
+    """
+    if format not in _CODECS:
+        raise ValueError(f"Invalid param `format` [{format}]")
+
+    encoder, decoder = _CODECS[format]
+
+    # Tells `ULIDType` that the driver speaks `ulid.ULID` natively.
+    engine.dialect.supports_native_ulid = True
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_ulid_codec(dbapi_connection, connection_record) -> None:
+        dbapi_connection.run_async(
+            lambda conn: conn.set_type_codec(
+                ULID_TYPE_NAME,
+                schema=schema,
+                encoder=encoder,
+                decoder=decoder,
+                format=format,
+            )
+        )
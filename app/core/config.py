@@ -1,14 +1,41 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import PostgresDsn, field_validator
+from pydantic import PostgresDsn, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Defaults per `API_ENVIRONMENT`; any variable set explicitly wins.
+ENVIRONMENT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "local": {
+        "LOG_LEVEL": "DEBUG",
+        "DB_ECHO": True,
+        "DB_POOL_SIZE": 5,
+        "DB_MAX_OVERFLOW": 5,
+    },
+    "pytest": {
+        "DB_ECHO": False,
+        "DB_POOL_SIZE": 2,
+        "DB_MAX_OVERFLOW": 0,
+        # Test transactions roll back; cached rows would outlive them.
+        "CACHE_ENABLED": False,
+        "SOFT_DELETE_COMPACTION_INTERVAL": 0,
+    },
+    "production": {
+        "DB_ECHO": False,
+        "DB_POOL_SIZE": 20,
+        "DB_MAX_OVERFLOW": 10,
+        "DB_POOL_RECYCLE": 1800,
+        "DB_POOL_PRE_PING": True,
+    },
+}
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True
     )
 
+    API_ENVIRONMENT: Literal["local", "pytest", "production"] = "local"
+
     PROJECT_NAME: str = "Character Chat Settings Management"
     API_V1_STR: str = "/api/v1"
     API_V2_STR: str = "/v2"
@@ -50,6 +77,77 @@ class Settings(BaseSettings):
             path=f"{values.data.get('POSTGRES_DB') or ''}",
         )
 
+    # DATABASE ENGINE / POOL
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # asyncpg prepared statement cache; set 0 behind pgbouncer transaction pooling
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # List statements kept per filter shape, see `app.crud.statements`
+    DB_SHAPE_CACHE_SIZE: int = 256
+    # Column type backing ULID keys: pgx_ulid `ulid`, `uuid`, `bytea` or `char(26)`.
+    # Fixed when the schema is created; see `app.models.types.ulid_type`.
+    ULID_STORAGE: Literal["ulid", "uuid", "byte", "char"] = "ulid"
+    # Statements slower than this are logged with their normalized SQL; 0 disables
+    DB_SLOW_QUERY_MS: float = 200.0
+
+    # READ REPLICAS
+    # DSNs of replicas GET requests read from, as a JSON list; none reads the primary
+    DATABASE_REPLICA_URLS: List[str] = []
+    # Replicas more than this many seconds behind the primary are not read from
+    DB_REPLICA_MAX_LAG: float = 5.0
+    # Seconds between replica lag checks
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+    # Seconds a client reads the primary after writing, to see its own writes
+    DB_READ_YOUR_WRITES_WINDOW: float = 5.0
+
+    # LOGGING
+    LOG_LEVEL: str = "INFO"
+    # Fraction of requests logged at DEBUG regardless of LOG_LEVEL
+    LOG_TRACE_SAMPLE_RATE: float = 0.0
+    # `X-Debug-Trace: <token>` logs one request at DEBUG; unset ignores the header
+    LOG_TRACE_TOKEN: Optional[str] = None
+
+    # CACHE
+    CACHE_ENABLED: bool = True
+    CACHE_MAXSIZE: int = 1024
+    CACHE_TTL: float = 60.0
+    CACHE_NOTIFY_CHANNEL: str = "cache_invalidation"
+
+    # SOFT DELETE
+    # Soft-deleted rows older than this are purged by the compaction job
+    SOFT_DELETE_RETENTION_DAYS: float = 30.0
+    # Seconds between compaction runs; 0 disables the job
+    SOFT_DELETE_COMPACTION_INTERVAL: float = 3600.0
+    SOFT_DELETE_COMPACTION_BATCH_SIZE: int = 1000
+
+    # PAGINATION
+    # How list pages count `total` unless a request picks: `exact`,
+    # planner-`estimated`, `cached` per filter or `none`
+    PAGINATION_COUNT_MODE: Literal["exact", "estimated", "cached", "none"] = "exact"
+    # Seconds a `cached` count is reused by requests with the same filters
+    PAGINATION_COUNT_CACHE_TTL: float = 30.0
+    PAGINATION_COUNT_CACHE_MAXSIZE: int = 1024
+
+    # SEARCH
+    # Engine behind `custom_search`: substring `ilike`, fuzzy `trigram` or
+    # full text `fts`; results are ranked by relevance except with `ilike`
+    SEARCH_ENGINE: Literal["ilike", "trigram", "fts"] = "fts"
+
+    # EXPORT
+    # Rows fetched per server-side cursor round-trip when streaming exports
+    EXPORT_YIELD_PER: int = 1000
+
+    @model_validator(mode="after")
+    def apply_environment_profile(self) -> "Settings":
+        for key, value in ENVIRONMENT_PROFILES[self.API_ENVIRONMENT].items():
+            if key not in self.model_fields_set:
+                setattr(self, key, value)
+        return self
+
 
 settings = Settings()
 print(settings)
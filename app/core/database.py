@@ -1,24 +1,76 @@
+from contextlib import asynccontextmanager
+from typing import Callable
+
 import sqlalchemy as sa
 import sqlalchemy.sql.schema as sa_schema
-from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, create_async_engine
+from fastapi import Request
+from sqlalchemy.ext.asyncio import (
+    AsyncAttrs,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 from sqlalchemy.orm import (
     DeclarativeBase,
     declared_attr,
     sessionmaker,
 )
 
+from app.core.codecs import register_ulid_codec
 from app.core.config import settings
+from app.core.instrumentation import install_query_hooks
+from app.core.pool import InstrumentedAsyncQueuePool
+from app.core.replicas import ReplicaSet, RoutingSession, wrote_recently
+
 
-engine = create_async_engine(
-    str(settings.DATABASE_URL),
-    echo=True,
-    future=True,
+def _create_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+    if settings.ULID_STORAGE == "ulid":
+        register_ulid_codec(engine)
+    install_query_hooks(engine, slow_query_ms=settings.DB_SLOW_QUERY_MS)
+    return engine
+
+
+engine = _create_engine(str(settings.DATABASE_URL))
+replicas = ReplicaSet(
+    [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
 )
 
 SessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    autoflush=False,
 )
 
+
+def read_session() -> AsyncSession:
+    """
+    A session that reads from a replica, unless none is within the allowed
+    lag or the client just wrote; see `app.core.replicas`.
+    """
+    session = SessionLocal()
+    if not wrote_recently():
+        replica = replicas.pick()
+        if replica is not None:
+            session.sync_session.replica = replica.sync_engine
+    return session
+
+
 # https://til.cybertec-postgresql.com/post/2019-09-02-Postgres-Constraint-Naming-Convention/
 postgres_naming_convention: sa_schema._NamingSchemaTD = {
     "pk": "%(table_name)s_pkey",
@@ -43,12 +95,9 @@ class Base(AsyncAttrs, DeclarativeBase):
         return "".join(sn)[1:]
 
 
-async def get_db():
-    """
-    Dependency function that yields db sessions
-    """
-    session: AsyncSession
-    async with SessionLocal() as session:
+@asynccontextmanager
+async def _scoped(session: AsyncSession):
+    async with session:
         try:
             yield session
         except Exception:
@@ -57,3 +106,30 @@ async def get_db():
         finally:
             await session.commit()
             await session.close()
+
+
+async def get_db(request: Request):
+    """
+    Dependency function that yields db sessions; GET and HEAD requests read
+    from a replica
+    """
+    read_only = request.method in ("GET", "HEAD")
+    async with _scoped(read_session() if read_only else SessionLocal()) as session:
+        yield session
+
+
+async def get_read_db():
+    """
+    Dependency function that yields db sessions reading from a replica, for
+    read-only requests made with another method
+    """
+    async with _scoped(read_session()) as session:
+        yield session
+
+
+def get_read_session_factory() -> Callable[[], AsyncSession]:
+    """
+    Dependency function that gives the factory of replica-reading sessions,
+    for responses that outlive `get_db`, such as streams
+    """
+    return read_session
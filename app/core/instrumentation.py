@@ -0,0 +1,225 @@
+"""Per-request SQL statement accounting.
+
+`install_query_hooks` times every cursor execution on an engine and charges it
+to the current request's `QueryStats`, held in a context variable that
+SQLAlchemy's greenlet bridge carries into the sync event handlers.
+`QueryStatsMiddleware` opens the stats for each HTTP request, reports them in
+a `Server-Timing` header and folds them into per-endpoint totals rendered by
+`render_metrics` in the Prometheus text format.
+"""
+
+import re
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.logging import debug_enabled
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|\$\d+)\s*,)+\s*(?:\?|\$\d+)\s*\)")
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+@dataclass
+class EndpointTotals:
+    requests: int = 0
+    statements: int = 0
+    seconds: float = 0.0
+
+
+_endpoints: Dict[str, EndpointTotals] = defaultdict(EndpointTotals)
+_slow_statements = 0
+
+
+def normalize_sql(statement: str, max_length: int = 500) -> str:
+    """
+    Collapse whitespace and replace literals, so statements that differ only
+    in values read (and group) the same.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _IN_LIST.sub("(...)", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    if len(statement) > max_length:
+        statement = statement[:max_length] + "..."
+    return statement
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def install_query_hooks(engine: AsyncEngine, *, slow_query_ms: float) -> None:
+    """
+    Time every statement on `engine` and log those slower than
+    `slow_query_ms` (0 disables the slow-query log).
+    """
+    slow_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        global _slow_statements
+
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+        if slow_seconds is not None and elapsed >= slow_seconds:
+            _slow_statements += 1
+            logger.opt(lazy=True).warning(
+                "Slow query ({:.1f} ms): {}",
+                lambda: elapsed * 1000,
+                lambda: normalize_sql(statement),
+            )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _handle_error(exception_context) -> None:
+        # `after_cursor_execute` does not fire for failed statements.
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+def server_timing(stats: QueryStats) -> str:
+    value = f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"'
+    if stats.count:
+        value += f", db-slowest;dur={stats.slowest_seconds * 1000:.2f}"
+    return value
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that scopes `QueryStats` to each HTTP request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                totals = _endpoints[f"{scope['method']} {route.path}"]
+                totals.requests += 1
+                totals.statements += stats.count
+                totals.seconds += stats.seconds
+            if stats.slowest_statement is not None and debug_enabled():
+                logger.debug(
+                    "{} {}: {} queries, {:.1f} ms, slowest {:.1f} ms: {}",
+                    scope["method"],
+                    scope["path"],
+                    stats.count,
+                    stats.seconds * 1000,
+                    stats.slowest_seconds * 1000,
+                    normalize_sql(stats.slowest_statement),
+                )
+
+
+def _metric(name: str, kind: str, help: str, samples: Iterable[str]) -> List[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", *samples]
+
+
+def render_metrics(pool_stats: Optional[dict] = None) -> str:
+    """
+    Per-endpoint request and statement totals, in the Prometheus text format.
+    """
+    endpoints = sorted(_endpoints.items())
+
+    def labelled(attr: str) -> List[str]:
+        return [
+            f'{{endpoint="{endpoint}"}} {getattr(totals, attr)}'
+            for endpoint, totals in endpoints
+        ]
+
+    lines = [
+        *_metric(
+            "http_requests_total",
+            "counter",
+            "Requests served, by endpoint.",
+            (f"http_requests_total{s}" for s in labelled("requests")),
+        ),
+        *_metric(
+            "db_statements_total",
+            "counter",
+            "SQL statements executed while serving requests, by endpoint.",
+            (f"db_statements_total{s}" for s in labelled("statements")),
+        ),
+        *_metric(
+            "db_statement_seconds_total",
+            "counter",
+            "Time spent executing SQL while serving requests, by endpoint.",
+            (f"db_statement_seconds_total{s}" for s in labelled("seconds")),
+        ),
+        *_metric(
+            "db_slow_statements_total",
+            "counter",
+            "Statements slower than DB_SLOW_QUERY_MS.",
+            [f"db_slow_statements_total {_slow_statements}"],
+        ),
+    ]
+    if pool_stats is not None:
+        for key in ("size", "checked_in", "checked_out", "overflow"):
+            lines += _metric(
+                f"db_pool_{key}",
+                "gauge",
+                f"Connection pool {key.replace('_', ' ')}.",
+                [f"db_pool_{key} {pool_stats[key]}"],
+            )
+        for key in ("checkouts", "timeouts"):
+            lines += _metric(
+                f"db_pool_{key}_total",
+                "counter",
+                f"Connection pool {key}.",
+                [f"db_pool_{key}_total {pool_stats[key]}"],
+            )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,142 @@
+"""Request-scoped logging.
+
+`RequestContextMiddleware` gives every HTTP request a correlation ID, taken
+from its `X-Request-ID` header or freshly generated, echoes it in the response
+and stamps it on every record logged while the request is served.
+
+DEBUG records are written only when `LOG_LEVEL` allows them or the request is
+traced: sampled at `LOG_TRACE_SAMPLE_RATE`, or asked for by sending
+`X-Debug-Trace: <LOG_TRACE_TOKEN>`. Hot paths check `debug_enabled()` first, or
+pass their arguments through `logger.opt(lazy=True)`, so an untraced request
+in production builds no debug message at all.
+"""
+
+import hmac
+import random
+import re
+import sys
+from contextvars import ContextVar
+from typing import Optional
+
+from loguru import logger
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.ulid_gen import ulid_generator
+
+REQUEST_ID_HEADER = "x-request-id"
+DEBUG_TRACE_HEADER = "x-debug-trace"
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level: <8}</level> | "
+    "<magenta>{extra[request_id]}</magenta> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
+)
+
+# Client-supplied IDs end up in log lines; anything else is replaced.
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_traced: ContextVar[bool] = ContextVar("debug_traced", default=False)
+_debug_level = True
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def debug_enabled() -> bool:
+    """
+    Whether a DEBUG record logged now would be written.
+    """
+    return _debug_level or _traced.get()
+
+
+def _patch(record) -> None:
+    record["extra"]["request_id"] = _request_id.get() or "-"
+
+
+def configure_logging(
+    level: Optional[str] = None, sink=sys.stderr, *, tracing: Optional[bool] = None
+) -> None:
+    """
+    Replace loguru's default handler with one writing records at `level`
+    (`LOG_LEVEL` by default), plus DEBUG records of traced requests when
+    `tracing` (by default, when `LOG_TRACE_SAMPLE_RATE` or `LOG_TRACE_TOKEN`
+    is set). Without it, loguru drops DEBUG calls before building a record.
+    """
+    global _debug_level
+
+    if tracing is None:
+        tracing = settings.LOG_TRACE_SAMPLE_RATE > 0 or bool(settings.LOG_TRACE_TOKEN)
+    level_no = logger.level(level or settings.LOG_LEVEL).no
+    debug_no = logger.level("DEBUG").no
+    _debug_level = level_no <= debug_no
+
+    def accept(record) -> bool:
+        no = record["level"].no
+        return no >= level_no or (no >= debug_no and _traced.get())
+
+    logger.remove()
+    logger.configure(patcher=_patch)
+    if tracing:
+        logger.add(
+            sink, level=min(level_no, debug_no), filter=accept, format=LOG_FORMAT
+        )
+    else:
+        logger.add(sink, level=level_no, format=LOG_FORMAT)
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that scopes the correlation ID and debug tracing to each
+    HTTP request.
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        trace_sample_rate: Optional[float] = None,
+        trace_token: Optional[str] = None,
+    ):
+        self.app = app
+        self.trace_sample_rate = (
+            settings.LOG_TRACE_SAMPLE_RATE
+            if trace_sample_rate is None
+            else trace_sample_rate
+        )
+        self.trace_token = trace_token or settings.LOG_TRACE_TOKEN
+
+    def _traced(self, headers: Headers) -> bool:
+        requested = headers.get(DEBUG_TRACE_HEADER)
+        if requested is not None and self.trace_token:
+            return hmac.compare_digest(requested, self.trace_token)
+        return self.trace_sample_rate > 0 and random.random() < self.trace_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        request_id = headers.get(REQUEST_ID_HEADER)
+        if request_id is None or not _VALID_REQUEST_ID.fullmatch(request_id):
+            request_id = str(ulid_generator.next())
+
+        id_token = _request_id.set(request_id)
+        trace_token = _traced.set(self._traced(headers))
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _traced.reset(trace_token)
+            _request_id.reset(id_token)
@@ -0,0 +1,236 @@
+"""Read replicas.
+
+`ReplicaSet` holds an engine per read replica and polls each one's replication
+lag in the background; `pick` hands out, in turn, those within `max_lag`
+seconds of the primary, or None to read the primary. A `RoutingSession` given
+a replica sends plain SELECTs there and everything else to the primary, and
+reads the primary too once it has written.
+
+Read-your-writes: `ReadYourWritesMiddleware` answers a request that wrote with
+a cookie, and requests carrying it read the primary until the window closes.
+Clients without a cookie jar see replica lag after their writes.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.selectable import CTE
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+
+READ_YOUR_WRITES_COOKIE = "primary_until"
+
+# Seconds since the last replayed transaction, 0 once caught up with what was
+# received; 0 on a server that is not replicating.
+_LAG = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """)
+
+
+@dataclass
+class _Client:
+    primary_until: float = 0.0
+    wrote: bool = False
+
+
+_client: ContextVar[Optional[_Client]] = ContextVar("db_client", default=None)
+
+
+def wrote_recently() -> bool:
+    """
+    Whether the current request's client wrote within the read-your-writes
+    window, and so must read the primary.
+    """
+    client = _client.get()
+    return client is not None and client.primary_until > time.time()
+
+
+def mark_write() -> None:
+    client = _client.get()
+    if client is not None:
+        client.wrote = True
+
+
+class ReplicaSet:
+    def __init__(
+        self, engines: Sequence[AsyncEngine], *, max_lag: float, interval: float
+    ):
+        """
+        **Parameters**
+
+        * `engines`: One engine per replica
+        * `max_lag`: Seconds behind the primary past which a replica is skipped
+        * `interval`: Seconds between lag checks; also the time a check may take
+        """
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self.interval = interval
+        # None while unreachable; missing until first checked. Either way,
+        # not read from.
+        self._lag: Dict[AsyncEngine, Optional[float]] = {}
+        self._reads: Dict[AsyncEngine, int] = {engine: 0 for engine in self.engines}
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _measure(self, engine: AsyncEngine) -> Any:
+        async with engine.connect() as conn:
+            return await conn.scalar(_LAG)
+
+    async def _check(self, engine: AsyncEngine) -> None:
+        try:
+            lag = await asyncio.wait_for(self._measure(engine), self.interval)
+        except Exception as e:
+            if self._lag.get(engine, 0.0) is not None:
+                logger.warning(
+                    "Replica {} unreachable: {!r}",
+                    engine.url.render_as_string(hide_password=True),
+                    e,
+                )
+            self._lag[engine] = None
+            return
+        self._lag[engine] = None if lag is None else float(lag)
+
+    async def check(self) -> None:
+        """
+        Measure the lag of every replica.
+        """
+        await asyncio.gather(*(self._check(engine) for engine in self.engines))
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """
+        The next replica within `max_lag`, or None if there is none.
+        """
+        ready = [engine for engine in self.engines if self._healthy(engine)]
+        if not ready:
+            return None
+        engine = ready[next(self._turn) % len(ready)]
+        self._reads[engine] += 1
+        return engine
+
+    def _healthy(self, engine: AsyncEngine) -> bool:
+        lag = self._lag.get(engine)
+        return lag is not None and lag <= self.max_lag
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "lag_seconds": self._lag.get(engine),
+                "healthy": self._healthy(engine),
+                "reads": self._reads[engine],
+            }
+            for engine in self.engines
+        ]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Replica lag check failed")
+
+    async def start(self) -> None:
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+def _writes_in_cte(select: Select) -> bool:
+    # e.g. `SELECT ... FROM (DELETE ... RETURNING ...) AS affected`
+    return any(
+        isinstance(from_, CTE) and isinstance(from_.element, UpdateBase)
+        for from_ in (*select.get_final_froms(), *select._independent_ctes)
+    )
+
+
+class RoutingSession(Session):
+    """
+    Session that runs plain SELECTs on `replica`, when one is set, and the
+    rest on the primary. A write, a SELECT from a data-modifying CTE, a bare
+    `connection()` (taken as one) or a locking SELECT pins it to the primary
+    from then on, so it reads what it wrote.
+    `read_replica` tells whether anything it loaded may be stale.
+    """
+
+    replica: Optional[Engine] = None
+    read_replica = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        # A bare `connection()`, as for COPY, may write anything.
+        if (
+            self._flushing
+            or clause is None
+            or isinstance(clause, UpdateBase)
+            or (isinstance(clause, Select) and _writes_in_cte(clause))
+        ):
+            mark_write()
+            self.replica = None
+        elif isinstance(clause, Select) and clause._for_update_arg is not None:
+            self.replica = None
+        elif self.replica is not None and isinstance(clause, Select):
+            self.read_replica = True
+            return self.replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware that tracks, per client, whether it wrote within the last
+    `window` seconds, in a cookie; see `wrote_recently`.
+    """
+
+    def __init__(self, app, *, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        client = _Client()
+        cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+        if READ_YOUR_WRITES_COOKIE in cookies:
+            with contextlib.suppress(ValueError):
+                client.primary_until = float(cookies[READ_YOUR_WRITES_COOKIE])
+        token = _client.set(client)
+
+        async def send_with_cookie(message):
+            # Sessions are committed before the response starts.
+            if message["type"] == "http.response.start" and client.wrote:
+                until = time.time() + self.window
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={until:.3f}; "
+                    f"Max-Age={math.ceil(self.window)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _client.reset(token)
@@ -0,0 +1,21 @@
+"""Response classes that skip FastAPI's `jsonable_encoder` round trip.
+
+By default a `response_model` is dumped to Python primitives and then encoded
+again by `json.dumps`. `ModelResponse` serializes a validated pydantic model
+straight to JSON bytes in pydantic-core; everything else goes through orjson.
+"""
+
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+DefaultJSONResponse = ORJSONResponse
+
+
+class ModelResponse(DefaultJSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            # Same bytes as `model_dump_json()`, minus the str round trip.
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
@@ -1,21 +1,137 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import copy
+import datetime
+import json
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from loguru import logger
 from pydantic import BaseModel
-from sqlalchemy import desc, select
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Text,
+    and_,
+    any_,
+    bindparam,
+    delete as sa_delete,
+    desc,
+    func,
+    inspect as sa_inspect,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+    tuple_,
+    update as sa_update,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, JSONPATH, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import (
+    joinedload,
+    make_transient_to_detached,
+    object_session,
+    selectinload,
+)
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import Executable, ExecutableOption
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.sql.visitors import InternalTraversal
 from ulid import ULID as _python_ULID
 
+from app.core.cache import TTLCache, invalidation_payload, register_cache
+from app.core.config import settings
 from app.core.database import Base
+from app.core.logging import debug_enabled
+from app.core.ulid_gen import min_ulid_for, ulid_generator
+from app.crud.loader import DataLoader
+from app.crud.statements import StatementCache, StatementT
+from app.models.mixins import SoftDeleteMixin, live_id_index_name, live_rows
+from app.models.types import DifferedULIDType, UserDefinedULIDType, coerce_ulid
+from app.schemas.bulk import BulkResult, BulkRowResult, BulkRowStatus
+from app.schemas.pagination import CountMode
+from app.utils.cursor import decode_cursor, encode_cursor
 from app.utils.datetime import utc_now_aware
 
+LoaderStrategy = Literal["selectin", "joined"]
+
+# pg_notify payloads are capped at 8000 bytes; 26-char ULIDs plus separators.
+# Invalidating more IDs at once flushes the whole table instead.
+NOTIFY_IDS_PER_PAYLOAD = 250
+
+# asyncpg caps a single statement at 32767 bind parameters.
+MAX_BIND_PARAMS = 32767
+
+# SQLSTATE unique_violation
+UNIQUE_VIOLATION = "23505"
+
+
+class DuplicateRecordError(ValueError):
+    """
+    A write collided with an existing record on a unique index.
+    """
+
+
+def _jsonpath_key(key: str) -> str:
+    escaped = key.replace("\\", "\\\\").replace('"', '\\"')
+    return f'$."{escaped}"'
+
+
+class _Explain(Executable, ClauseElement):
+    _traverse_internals = [("statement", InternalTraversal.dp_clauseelement)]
+    inherit_cache = True
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+@dataclass
+class KeysetResult(Generic[ModelType]):
+    items: List[ModelType]
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+
+@dataclass
+class OffsetResult(Generic[ModelType]):
+    items: List[ModelType]
+    total: Optional[int]
+    has_next: bool
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    def __init__(self, model: Type[ModelType], *, cache: Optional[TTLCache] = None):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
 
@@ -23,40 +139,869 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         * `model`: A SQLAlchemy model class
         * `schema`: A Pydantic model (schema) class
+        * `cache`: Optional read-through cache for `get` lookups
         """
         self.model = model
+        self.cache = cache
+        # Exact counts by statement, for `count(mode="cached")`.
+        self.count_cache = TTLCache(
+            maxsize=settings.PAGINATION_COUNT_CACHE_MAXSIZE,
+            ttl=settings.PAGINATION_COUNT_CACHE_TTL,
+        )
+        self.statements = StatementCache(maxsize=settings.DB_SHAPE_CACHE_SIZE)
+        self._loader_options: Dict[Tuple[Any, ...], Tuple[ExecutableOption, ...]] = {}
+        if cache is not None:
+            register_cache(model.__tablename__, cache)
+
+    def _cache_put(self, obj: ModelType, *fields: str) -> None:
+        """
+        Cache a column snapshot of `obj` under its ID, plus `field -> id` entries
+        for secondary lookups. ORM instances are never shared across sessions.
+        Rows a session may have read from a replica are not cached: one behind
+        the primary would re-cache what its invalidation just dropped.
+        """
+        if self.cache is None or not self.cache.enabled:
+            return
+        if getattr(object_session(obj), "read_replica", False):
+            return
+        values = {
+            attr.key: copy.deepcopy(getattr(obj, attr.key))
+            for attr in sa_inspect(self.model).column_attrs
+            if not attr.deferred
+        }
+        self.cache.set(("id", obj.id), values)
+        for field in fields:
+            self.cache.set((field, values[field]), obj.id)
+
+    async def _cache_lookup(
+        self, db: AsyncSession, field: str, value: Any
+    ) -> Optional[ModelType]:
+        if self.cache is None or not self.cache.enabled:
+            return None
+
+        id = value if field == "id" else self.cache.get((field, value))
+        if id is None:
+            return None
+        values = self.cache.get(("id", id))
+        if values is None or values[field] != value:
+            # The secondary key moved to another value since it was cached.
+            return None
+
+        obj = self.model(**copy.deepcopy(values))
+        make_transient_to_detached(obj)
+        # `load=False` attaches the snapshot without emitting a SELECT.
+        return await db.merge(obj, load=False)
+
+    async def _cache_invalidate(
+        self, db: AsyncSession, ids: Sequence[_python_ULID]
+    ) -> None:
+        """
+        Drop `ids` locally and notify other workers; the notification is only
+        delivered once the surrounding transaction commits. More than
+        `NOTIFY_IDS_PER_PAYLOAD` IDs flush the table's cache instead, in one
+        notification.
+        """
+        if self.cache is None or not ids:
+            return
+        if len(ids) > NOTIFY_IDS_PER_PAYLOAD:
+            self.cache.clear()
+            payload = invalidation_payload(self.model.__tablename__)
+        else:
+            for id in ids:
+                self.cache.delete(("id", id))
+            payload = invalidation_payload(self.model.__tablename__, list(ids))
+        await db.execute(select(func.pg_notify(settings.CACHE_NOTIFY_CHANNEL, payload)))
+
+    def loader_options(
+        self, include: Sequence[str], *, strategy: LoaderStrategy = "selectin"
+    ) -> Tuple[ExecutableOption, ...]:
+        """
+        Build eager loader options for the named relationships.
+
+        `selectin` costs one extra `WHERE fk IN (...)` query per relationship
+        for a whole page; `joined` folds it into the main query.
+        Raises `ValueError` on an unknown relationship.
 
-    async def get(self, db: AsyncSession, id: _python_ULID) -> Optional[ModelType]:
+        The same names always give the same option objects, so they can key
+        the statements they are built into.
+        """
+        key = (tuple(sorted(set(include))), strategy)
+        options = self._loader_options.get(key)
+        if options is not None:
+            return options
+
+        relationships = sa_inspect(self.model).relationships
+        loader = selectinload if strategy == "selectin" else joinedload
+        for name in key[0]:
+            if name not in relationships:
+                raise ValueError(f"{name} is not a valid relationship to include.")
+        options = tuple(loader(getattr(self.model, name)) for name in key[0])
+        self._loader_options[key] = options
+        return options
+
+    def _id_any(self, ids: Sequence[_python_ULID]):
+        """
+        `id = ANY($1)`: one array bind, so the statement text (and its prepared
+        statement) is the same whatever the number of IDs.
+        """
+        column = self.model.__table__.c.id
+        return self.model.id == any_(literal(list(ids), type_=ARRAY(column.type)))
+
+    def _loader(self, db: AsyncSession) -> DataLoader[_python_ULID, ModelType]:
+        """
+        Per-session (so per-request) loader coalescing `get` calls.
+        """
+        key = ("loader", self.model)
+        if key not in db.info:
+
+            async def _batch_load(ids: List[_python_ULID]) -> Dict[Any, ModelType]:
+                return {obj.id: obj for obj in await self.get_many(db, ids=ids)}
+
+            db.info[key] = DataLoader(_batch_load)
+        return db.info[key]
+
+    async def get(
+        self,
+        db: AsyncSession,
+        id: _python_ULID,
+        *,
+        options: Sequence[ExecutableOption] = (),
+    ) -> Optional[ModelType]:
         """
         Get a single record by ID.
+
+        Without loader options, concurrent calls on one session within the same
+        event-loop tick are coalesced into a single `id = ANY($1)` query.
+        """
+        if not options:
+            # Loaded rows are keyed by their ULID, whatever form `id` came in.
+            id = coerce_ulid(id)
+            obj = await self._cache_lookup(db, "id", id)
+            if obj is not None:
+                return obj
+
+            obj = await self._loader(db).load(id)
+            if obj is not None:
+                self._cache_put(obj)
+            return obj
+
+        result = await db.execute(
+            select(self.model).filter(self.model.id == id).options(*options)
+        )
+        return result.unique().scalars().first()
+
+    async def get_updated_at(
+        self, db: AsyncSession, *, id: _python_ULID
+    ) -> Optional[datetime.datetime]:
+        """
+        Cheap version probe for conditional requests: the cached snapshot if
+        any, else a single-column `SELECT updated_at` by primary key.
+        """
+        if self.cache is not None and self.cache.enabled:
+            values = self.cache.get(("id", id))
+            if values is not None:
+                return values["updated_at"]
+
+        result = await db.execute(
+            select(self.model.updated_at).where(self.model.id == id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Sequence[_python_ULID],
+        options: Sequence[ExecutableOption] = (),
+    ) -> List[ModelType]:
         """
-        result = await db.execute(select(self.model).filter(self.model.id == id))
-        return result.scalars().first()
+        Get the records matching `ids`, in no particular order.
+        """
+        result = await db.execute(
+            select(self.model).where(self._id_any(ids)).options(*options)
+        )
+        return result.unique().scalars().all()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        created_after: Optional[datetime.datetime] = None,
+        created_before: Optional[datetime.datetime] = None,
+        options: Sequence[ExecutableOption] = (),
     ) -> List[ModelType]:
         """
         Get multiple records.
         """
+        query = self.where_created(
+            select(self.model).options(*options),
+            created_after=created_after,
+            created_before=created_before,
+        )
         result = await db.execute(
-            select(self.model).offset(skip).limit(limit).order_by(self.model.id)
+            query.offset(skip).limit(limit).order_by(self.model.id)
         )
-        return result.scalars().all()
+        return result.unique().scalars().all()
 
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+    async def stream_multi(
+        self,
+        db: AsyncSession,
+        *,
+        query: Optional[Select] = None,
+        yield_per: int = 1000,
+    ) -> AsyncIterator[List[ModelType]]:
         """
-        Create a new record.
+        Stream records in partitions of `yield_per` through a server-side
+        cursor, so memory stays flat regardless of the result size.
         """
-        logger.debug(f"=== CREATE {self.model.__name__}")
-        async with db.begin_nested():
-            db_obj = self.model(
-                **obj_in.model_dump(exclude_none=True, exclude_unset=True)
+        if query is None:
+            query = select(self.model).order_by(self.model.id)
+
+        result = await db.stream_scalars(query.execution_options(yield_per=yield_per))
+        async for partition in result.partitions():
+            yield partition
+            # Drop the partition from the identity map before fetching the next.
+            db.expunge_all()
+
+    def where_created(
+        self,
+        query: Select,
+        *,
+        created_after: Optional[datetime.datetime] = None,
+        created_before: Optional[datetime.datetime] = None,
+    ) -> Select:
+        """
+        Restrict `query` to records created in `[created_after, created_before)`.
+
+        The ULID primary key embeds its creation millisecond, so the window is
+        rewritten into a primary key range (`id >= min_ulid_for(ts)`) served by
+        the PK index instead of a separate `created_at` index. The bounds are
+        bound by the names `created_params` gives them.
+        """
+        params = self.created_params(
+            created_after=created_after, created_before=created_before
+        )
+        if "created_after" in params:
+            query = query.where(
+                self.model.id >= bindparam("created_after", params["created_after"])
+            )
+        if "created_before" in params:
+            query = query.where(
+                self.model.id < bindparam("created_before", params["created_before"])
+            )
+        return query
+
+    def created_params(
+        self,
+        *,
+        created_after: Optional[datetime.datetime] = None,
+        created_before: Optional[datetime.datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Bind parameters of `where_created`, by name.
+        """
+        params = {}
+        if created_after is not None:
+            params["created_after"] = min_ulid_for(created_after)
+        if created_before is not None:
+            params["created_before"] = min_ulid_for(created_before)
+        return params
+
+    def where_jsonb(
+        self,
+        query: Select,
+        column: Any,
+        *,
+        contains: Any = None,
+        has_keys: Sequence[str] = (),
+        path_equals: Optional[Tuple[Sequence[str], Any]] = None,
+    ) -> Select:
+        """
+        Restrict `query` on the JSONB `column` with containment (`@>`), top
+        level key existence and equality of the value at a key path.
+
+        Every form is one a `jsonb_path_ops` GIN index serves: key existence
+        is asked as a JSON path (`@? '$."key"'`) rather than with `?`, and path
+        equality as containment, rechecked exactly with `#>`. All values are
+        bind parameters, named as `jsonb_params` names them.
+        """
+        params = self.jsonb_params(
+            column, contains=contains, has_keys=has_keys, path_equals=path_equals
+        )
+        prefix = column.key
+        if contains is not None:
+            query = query.where(
+                column.contains(bindparam(f"{prefix}_contains", contains, type_=JSONB))
+            )
+        for i in range(len(has_keys)):
+            name = f"{prefix}_key_{i}"
+            query = query.where(
+                column.op("@?")(bindparam(name, params[name], type_=JSONPATH))
             )
-            db.add(db_obj)
+        if path_equals is not None:
+            path = bindparam(
+                f"{prefix}_path", params[f"{prefix}_path"], type_=ARRAY(Text)
+            )
+            query = query.where(
+                column.contains(
+                    bindparam(
+                        f"{prefix}_document", params[f"{prefix}_document"], type_=JSONB
+                    )
+                ),
+                column.op("#>", return_type=JSONB)(path)
+                == bindparam(f"{prefix}_value", params[f"{prefix}_value"], type_=JSONB),
+            )
+        return query
+
+    def jsonb_params(
+        self,
+        column: Any,
+        *,
+        contains: Any = None,
+        has_keys: Sequence[str] = (),
+        path_equals: Optional[Tuple[Sequence[str], Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Bind parameters of `where_jsonb`, by name.
+        """
+        prefix = column.key
+        params = {}
+        if contains is not None:
+            params[f"{prefix}_contains"] = contains
+        for i, key in enumerate(has_keys):
+            params[f"{prefix}_key_{i}"] = _jsonpath_key(key)
+        if path_equals is not None:
+            path, value = path_equals
+            document = value
+            for key in reversed(path):
+                document = {key: document}
+            params[f"{prefix}_path"] = list(path)
+            params[f"{prefix}_document"] = document
+            params[f"{prefix}_value"] = value
+        return params
+
+    def _shaped(
+        self,
+        shape: Optional[Hashable],
+        kind: Hashable,
+        build: Callable[[], StatementT],
+        params: Iterable[str],
+    ) -> StatementT:
+        # Without a shape the statement is one-off; see `app.crud.statements`.
+        if shape is None:
+            return build()
+        return self.statements.get((kind, shape), build, params)
 
+    async def _estimate_count(
+        self,
+        db: AsyncSession,
+        query: Select,
+        params: Dict[str, Any],
+        shape: Optional[Hashable],
+    ) -> int:
+        if query.whereclause is None:
+            # Refreshed by ANALYZE; -1 until the relation was first analyzed.
+            relation = self.model.__tablename__
+            if issubclass(self.model, SoftDeleteMixin):
+                relation = live_id_index_name(relation)
+            reltuples = await db.scalar(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": relation},
+            )
+            if reltuples is not None and reltuples >= 0:
+                return int(reltuples)
+
+        explain = self._shaped(
+            shape, "explain", lambda: _Explain(live_rows(query.order_by(None))), params
+        )
+        plan = await db.scalar(explain, params)
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def count(
+        self,
+        db: AsyncSession,
+        query: Select,
+        *,
+        mode: CountMode = "exact",
+        params: Optional[Dict[str, Any]] = None,
+        shape: Optional[Hashable] = None,
+    ) -> Optional[int]:
+        """
+        Count the rows `query` selects:
+
+        * `exact`: `SELECT count(*)` over it
+        * `estimated`: the planner's row estimate; for an unfiltered query, the
+          row count last recorded by ANALYZE in `pg_class`
+        * `cached`: an exact count, reused by queries with the same SQL and
+          parameters for `PAGINATION_COUNT_CACHE_TTL` seconds
+        * `none`: no count at all
+
+        `params` and `shape` are as for `get_page`.
+        """
+        params = params or {}
+        if mode == "none":
+            return None
+        if mode == "estimated":
+            return await self._estimate_count(db, query, params, shape)
+
+        count_query = self._shaped(
+            shape,
+            "count",
+            lambda: live_rows(
+                select(func.count()).select_from(query.order_by(None).subquery())
+            ),
+            params,
+        )
+        if mode == "exact":
+            return await db.scalar(count_query, params)
+
+        if shape is not None:
+            key = (shape, repr(sorted(params.items())))
+        else:
+            compiled = count_query.compile(dialect=postgresql.dialect())
+            key = (str(compiled), repr(sorted({**compiled.params, **params}.items())))
+        total = self.count_cache.get(key)
+        if total is None:
+            total = await db.scalar(count_query, params)
+            self.count_cache.set(key, total)
+        return total
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        query: Optional[Select] = None,
+        params: Optional[Dict[str, Any]] = None,
+        shape: Optional[Hashable] = None,
+        page: int = 1,
+        size: int = 50,
+        count: CountMode = "exact",
+        options: Sequence[ExecutableOption] = (),
+    ) -> OffsetResult[ModelType]:
+        """
+        Get a page of records with offset pagination, with a `total` counted
+        per `count`. One row past the page tells whether another follows; an
+        approximate total is corrected by it, and is exact on the last page.
+
+        With a `shape`, the statements derived from `query` are built once per
+        shape and `options`, and reused with `params`, the values of `query`'s
+        named bind parameters; see `app.crud.statements`.
+        """
+        if query is None:
+            query = select(self.model).order_by(self.model.id)
+        params = params or {}
+
+        offset = (page - 1) * size
+        statement = self._shaped(
+            shape,
+            ("page", tuple(options)),
+            lambda: live_rows(
+                query.options(*options)
+                .offset(bindparam("offset"))
+                .limit(bindparam("limit"))
+            ),
+            [*params, "offset", "limit"],
+        )
+        result = await db.execute(
+            statement, {**params, "offset": offset, "limit": size + 1}
+        )
+        items = list(result.unique().scalars().all())
+        has_next = len(items) > size
+        items = items[:size]
+
+        total = await self.count(db, query, mode=count, params=params, shape=shape)
+        if total is not None and count != "exact":
+            seen = offset + len(items)
+            if has_next:
+                total = max(total, seen + 1)
+            elif items or page == 1:
+                total = seen
+        return OffsetResult(items=items, total=total, has_next=has_next)
+
+    def _keyset_order(
+        self, order_by: Optional[Sequence[str]]
+    ) -> List[Tuple[str, bool]]:
+        """
+        Normalize `+field` / `-field` specs to `(field, descending)` pairs, with
+        the ULID primary key appended as the unique tiebreaker.
+        Raises `ValueError` on anything but a non-nullable column: NULLs fall
+        outside the row-value comparisons a cursor resumes from.
+        """
+        column_attrs = sa_inspect(self.model).column_attrs
+        keys: List[Tuple[str, bool]] = []
+        for spec in order_by or []:
+            descending = spec.startswith("-")
+            name = spec.lstrip("+-")
+            if name not in column_attrs or any(
+                column.nullable for column in column_attrs[name].columns
+            ):
+                raise ValueError(f"{name} is not a valid ordering field.")
+            keys.append((name, descending))
+
+        if not any(name == "id" for name, _ in keys):
+            # Follow the direction of the last key so the tiebreaker keeps
+            # walking the same way as the sort it breaks ties for.
+            keys.append(("id", keys[-1][1] if keys else False))
+        return keys
+
+    def _keyset_predicate(self, keys: List[Tuple[str, bool]], *, backwards: bool):
+        # Bounds are bound at execution, as `cursor_<field>`.
+        columns = [getattr(self.model, name) for name, _ in keys]
+        bounds = [
+            bindparam(f"cursor_{name}", type_=c.type)
+            for c, (name, _) in zip(columns, keys)
+        ]
+        directions = {descending != backwards for _, descending in keys}
+
+        if len(directions) == 1:
+            # Uniform direction: a row-value comparison is served by a single
+            # index range scan, e.g. `(created_at, id) > ($1, $2)`.
+            if directions.pop():
+                return tuple_(*columns) < tuple_(*bounds)
+            return tuple_(*columns) > tuple_(*bounds)
+
+        # Mixed directions: expand into `a > x OR (a = x AND b < y) OR ...`.
+        clauses = []
+        for i, ((_, descending), column) in enumerate(zip(keys, columns)):
+            prefix = [columns[j] == bounds[j] for j in range(i)]
+            if descending != backwards:
+                step = column < bounds[i]
+            else:
+                step = column > bounds[i]
+            clauses.append(and_(*prefix, step))
+        return or_(*clauses)
+
+    async def get_multi_keyset(
+        self,
+        db: AsyncSession,
+        *,
+        query: Optional[Select] = None,
+        order_by: Optional[Sequence[str]] = None,
+        cursor: Optional[str] = None,
+        size: int = 50,
+        params: Optional[Dict[str, Any]] = None,
+        shape: Optional[Hashable] = None,
+        options: Sequence[ExecutableOption] = (),
+    ) -> KeysetResult[ModelType]:
+        """
+        Get a page of records with keyset (seek) pagination.
+
+        Cursors encode the `(sort_key, ..., id)` of the page boundary, so every
+        page is a range scan regardless of depth. Because ULIDs sort by time,
+        the default `id` ordering walks the primary key index in insertion
+        order. Sort columns must be NOT NULL.
+
+        `params`, `shape` and `options` are as for `get_page`.
+
+        Raises `ValueError` on an unknown ordering field or a malformed cursor.
+        """
+        keys = self._keyset_order(order_by)
+        order = [f"{'-' if descending else '+'}{name}" for name, descending in keys]
+
+        if query is None:
+            query = select(self.model)
+        params = {**(params or {}), "limit": size + 1}
+
+        backwards = False
+        if cursor is not None:
+            cursor_order, values, backwards = decode_cursor(
+                cursor,
+                [getattr(self.model, name).type.python_type for name, _ in keys],
+            )
+            if cursor_order != order or len(values) != len(keys):
+                raise ValueError("Cursor does not match the requested ordering")
+            params.update(
+                (f"cursor_{name}", value) for (name, _), value in zip(keys, values)
+            )
+
+        def build() -> Select:
+            statement = query.options(*options)
+            if cursor is not None:
+                statement = statement.where(
+                    self._keyset_predicate(keys, backwards=backwards)
+                )
+            columns = [getattr(self.model, name) for name, _ in keys]
+            return live_rows(
+                statement.order_by(
+                    *(
+                        c.desc() if descending != backwards else c.asc()
+                        for c, (_, descending) in zip(columns, keys)
+                    )
+                ).limit(bindparam("limit"))
+            )
+
+        statement = self._shaped(
+            shape,
+            ("keyset", tuple(options), tuple(order), cursor is not None, backwards),
+            build,
+            params,
+        )
+        result = await db.execute(statement, params)
+        items = list(result.unique().scalars().all())
+        has_more = len(items) > size
+        items = items[:size]
+        if backwards:
+            items.reverse()
+
+        def _boundary(obj: ModelType, *, backwards: bool) -> str:
+            values = [getattr(obj, name) for name, _ in keys]
+            return encode_cursor(order, values, backwards=backwards)
+
+        page = KeysetResult(items=items)
+        if items:
+            # The over-fetched row tells whether more rows lie in the walking
+            # direction; the opposite side exists iff we arrived via a cursor.
+            if has_more or backwards:
+                page.next_cursor = _boundary(items[-1], backwards=False)
+            if (has_more and backwards) or (cursor is not None and not backwards):
+                page.previous_cursor = _boundary(items[0], backwards=True)
+        return page
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        """
+        Create a new record with a single `INSERT ... ON CONFLICT DO NOTHING
+        RETURNING *`; the unique indexes arbitrate instead of a prior SELECT.
+
+        Raises `DuplicateRecordError` if the record collides with another one.
+        """
+        if debug_enabled():
+            logger.debug("=== CREATE {}", self.model.__name__)
+        result = await db.execute(
+            pg_insert(self.model)
+            .values(**obj_in.model_dump(exclude_none=True, exclude_unset=True))
+            .on_conflict_do_nothing()
+            .returning(self.model)
+        )
+        db_obj = result.scalars().first()
+        if db_obj is None:
+            raise DuplicateRecordError(f"{self.model.__name__} already exists")
         return db_obj
 
+    def _bulk_rows(self, objs_in: Sequence[CreateSchemaType]) -> List[Dict[str, Any]]:
+        """
+        Dump create schemas to uniform row dicts with client-side ULIDs, so a
+        multi-row VALUES list can be built and rows matched back to inputs.
+        """
+        rows = []
+        for obj_in, new_id in zip(objs_in, ulid_generator.batch(len(objs_in))):
+            row = obj_in.model_dump()
+            row["id"] = new_id
+            rows.append(row)
+        return rows
+
+    def _bulk_batches(
+        self, rows: List[Dict[str, Any]], batch_size: int
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        per_row = len(self.model.__table__.columns)
+        step = max(1, min(batch_size, MAX_BIND_PARAMS // per_row))
+        for start in range(0, len(rows), step):
+            yield start, rows[start : start + step]
+
+    async def _copy_rows(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """
+        Load rows with asyncpg `copy_records_to_table` on the session's
+        connection. With `ulid` storage this requires the binary `ulid` codec
+        from `app.core.codecs`.
+        """
+        table = self.model.__table__
+        columns = [
+            c for c in table.columns if c.key in rows[0] or c.default is not None
+        ]
+        defaults = {
+            c.key: c.default.arg(None) if c.default.is_callable else c.default.arg
+            for c in columns
+            if c.key not in rows[0]
+        }
+        json_keys = {c.key for c in columns if isinstance(c.type, JSON)}
+
+        connection = await db.connection()
+        # COPY bypasses SQLAlchemy; ULID columns stored as `uuid`, `bytea` or
+        # `char` still need their bind conversion.
+        dialect = connection.dialect
+        processors = {
+            c.key: c.type.dialect_impl(dialect).bind_processor(dialect)
+            for c in columns
+            if isinstance(c.type, (UserDefinedULIDType, DifferedULIDType))
+        }
+
+        def _record(row: Dict[str, Any]) -> Tuple[Any, ...]:
+            values = []
+            for c in columns:
+                value = row.get(c.key, defaults.get(c.key))
+                if c.key in json_keys and value is not None:
+                    value = json.dumps(value)
+                elif processors.get(c.key) is not None:
+                    value = processors[c.key](value)
+                values.append(value)
+            return tuple(values)
+
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name,
+            schema_name=table.schema,
+            columns=[c.name for c in columns],
+            records=[_record(row) for row in rows],
+        )
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[CreateSchemaType],
+        batch_size: int = 1000,
+        use_copy: bool = False,
+    ) -> BulkResult:
+        """
+        Create records in batches of multi-row `INSERT ... ON CONFLICT DO
+        NOTHING RETURNING id`. Rows hitting a unique constraint are reported
+        as skipped.
+
+        With `use_copy`, rows are streamed through `COPY` instead; there is no
+        per-row conflict handling, a single violation aborts the load.
+        """
+        if debug_enabled():
+            logger.debug("=== CREATE MANY {} x {}", self.model.__name__, len(objs_in))
+        rows = self._bulk_rows(objs_in)
+        if not rows:
+            return BulkResult()
+
+        if use_copy:
+            await self._copy_rows(db, rows)
+            return BulkResult.from_rows(
+                [
+                    BulkRowResult(index=i, id=row["id"], status=BulkRowStatus.created)
+                    for i, row in enumerate(rows)
+                ]
+            )
+
+        results = []
+        for start, batch in self._bulk_batches(rows, batch_size):
+            stmt = (
+                pg_insert(self.model)
+                .values(batch)
+                .on_conflict_do_nothing()
+                .returning(self.model.id)
+            )
+            inserted = set((await db.execute(stmt)).scalars().all())
+            for i, row in enumerate(batch, start):
+                if row["id"] in inserted:
+                    results.append(
+                        BulkRowResult(
+                            index=i, id=row["id"], status=BulkRowStatus.created
+                        )
+                    )
+                else:
+                    results.append(BulkRowResult(index=i, status=BulkRowStatus.skipped))
+
+        return BulkResult.from_rows(results)
+
+    async def _upsert_rows(
+        self,
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        fields: FrozenSet[str],
+        conflict_columns: Sequence[str],
+    ) -> Dict[Tuple[Any, ...], Tuple[Any, bool]]:
+        """
+        One `INSERT ... ON CONFLICT DO UPDATE` of `rows`, updating only
+        `fields` on conflict. Maps each conflict key to its row's ID and
+        whether it was inserted.
+        """
+        stmt = pg_insert(self.model).values(rows)
+        update_set = {
+            k: stmt.excluded[k]
+            for k in sorted(fields)
+            if k != "id" and k not in conflict_columns
+        }
+        if hasattr(self.model, "updated_at"):
+            update_set["updated_at"] = func.now()
+        if not update_set:
+            # A no-op SET still locks and returns the conflicting row.
+            key = conflict_columns[0]
+            update_set[key] = stmt.excluded[key]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            # Infer the partial unique index over live rows.
+            index_where=(
+                self.model.deleted_at.is_(None)
+                if issubclass(self.model, SoftDeleteMixin)
+                else None
+            ),
+            set_=update_set,
+        ).returning(
+            self.model.id,
+            *(getattr(self.model, c) for c in conflict_columns),
+            # `xmax` is 0 on freshly inserted tuples.
+            literal_column("xmax = 0", type_=Boolean),
+        )
+        return {
+            tuple(row[1:-1]): (row[0], row[-1])
+            for row in (await db.execute(stmt)).all()
+        }
+
+    async def upsert_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[CreateSchemaType],
+        conflict_columns: Sequence[str],
+        batch_size: int = 1000,
+    ) -> BulkResult:
+        """
+        Insert or update records in batches of multi-row `INSERT ... ON
+        CONFLICT (conflict_columns) DO UPDATE ... RETURNING`.
+
+        An update only overwrites the fields its input set, so omitted
+        optional fields keep their stored values; inputs setting different
+        fields go in separate statements. `conflict_columns` must be covered
+        by a unique index. Inputs sharing a conflict key and set fields
+        within a batch collapse to the last one and share its outcome.
+        """
+        if debug_enabled():
+            logger.debug("=== UPSERT MANY {} x {}", self.model.__name__, len(objs_in))
+        rows = self._bulk_rows(objs_in)
+        if not rows:
+            return BulkResult()
+        provided = [frozenset(obj_in.model_fields_set) for obj_in in objs_in]
+
+        def _key(row: Dict[str, Any]) -> Tuple[Any, ...]:
+            return tuple(row[c] for c in conflict_columns)
+
+        results = []
+        for start, batch in self._bulk_batches(rows, batch_size):
+            groups: Dict[FrozenSet[str], List[Dict[str, Any]]] = {}
+            for i, row in enumerate(batch, start):
+                groups.setdefault(provided[i], []).append(row)
+
+            outcomes = {}
+            for fields, group in groups.items():
+                # ON CONFLICT DO UPDATE cannot touch the same row twice per
+                # statement.
+                unique_rows = list({_key(row): row for row in group}.values())
+                outcomes[fields] = await self._upsert_rows(
+                    db, unique_rows, fields, conflict_columns
+                )
+            for i, row in enumerate(batch, start):
+                row_id, inserted = outcomes[provided[i]][_key(row)]
+                results.append(
+                    BulkRowResult(
+                        index=i,
+                        id=row_id,
+                        status=(
+                            BulkRowStatus.created if inserted else BulkRowStatus.updated
+                        ),
+                    )
+                )
+
+        await self._cache_invalidate(
+            db, [row.id for row in results if row.status == BulkRowStatus.updated]
+        )
+        return BulkResult.from_rows(results)
+
     async def update(
         self,
         db: AsyncSession,
@@ -71,48 +1016,169 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             exclude_none=True,
             exclude_unset=True,
         )
-        logger.debug(f"{refined_update_fields=}")
-        for k in refined_update_fields.keys():
-            logger.debug(f"{type(db_obj).__name__}.{k} = {db_obj.__getattribute__(k)}")
+        if debug_enabled():
+            logger.debug(
+                "=== UPDATE {} {}: {}",
+                type(db_obj).__name__,
+                db_obj.id,
+                {k: (getattr(db_obj, k), v) for k, v in refined_update_fields.items()},
+            )
         # UPDATE FIELDS
         async with db.begin_nested():
-            logger.debug(f"=== UPDATE {type(db_obj).__name__}")
             for k, v in refined_update_fields.items():
-                db_obj.__setattr__(k, v)
-
-        for k in refined_update_fields.keys():
-            logger.debug(f"{type(db_obj).__name__}.{k} = {db_obj.__getattribute__(k)}")
+                setattr(db_obj, k, v)
 
+        await self._cache_invalidate(db, [db_obj.id])
         await db.refresh(db_obj)
         return db_obj
 
+    async def update_by_id(
+        self,
+        db: AsyncSession,
+        *,
+        id: _python_ULID,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        if_updated_at: Optional[Sequence[datetime.datetime]] = None,
+    ) -> Optional[ModelType]:
+        """
+        Update a record without loading it first: a single
+        `UPDATE ... WHERE id = $1 RETURNING *`.
+
+        With `if_updated_at`, the row is only updated while its `updated_at` is
+        one of those values (optimistic concurrency). Returns None when no row
+        matched; `get_updated_at` tells a missing row from a stale one.
+
+        Raises `DuplicateRecordError` if the new values collide with another
+        record; the failed statement leaves the transaction aborted.
+        """
+        if isinstance(obj_in, dict):
+            values = obj_in
+        else:
+            values = obj_in.model_dump(exclude_none=True, exclude_unset=True)
+
+        criteria = [self.model.id == id]
+        if if_updated_at is not None:
+            criteria.append(self.model.updated_at.in_(if_updated_at))
+
+        if not values:
+            # Nothing to write, but the preconditions still apply.
+            result = await db.execute(select(self.model).where(*criteria))
+            return result.scalars().first()
+
+        if debug_enabled():
+            logger.debug("=== UPDATE {} {}: {}", self.model.__name__, id, values)
+        try:
+            result = await db.execute(
+                sa_update(self.model)
+                .where(*criteria)
+                .values(**values)
+                .returning(self.model)
+                # Refresh an instance of this row already held by the session.
+                .execution_options(populate_existing=True)
+            )
+        except IntegrityError as e:
+            if getattr(e.orig, "pgcode", None) == UNIQUE_VIOLATION:
+                raise DuplicateRecordError(
+                    f"{self.model.__name__} already exists"
+                ) from e
+            raise
+        obj = result.scalars().first()
+        if obj is not None:
+            await self._cache_invalidate(db, [id])
+        return obj
+
     async def remove(self, db: AsyncSession, *, id: _python_ULID) -> ModelType:
         """
         Delete a record.
         """
         obj = await db.get(self.model, id)
         await db.delete(obj)
+        await self._cache_invalidate(db, [id])
         await db.commit()
         return obj
 
-    async def delete(self, db: AsyncSession, *, id: _python_ULID) -> None:
+    async def delete_where(
+        self, db: AsyncSession, *criteria: Any, soft: bool = False
+    ) -> int:
         """
-        Delete a record.
+        Delete every record matching `criteria` in a single
+        `DELETE ... RETURNING id`, or with `soft`, mark them with
+        `UPDATE ... SET deleted_at = now() RETURNING id`.
+
+        Soft-deleted records are out of scope either way. Returns the number
+        of affected records. Only up to `NOTIFY_IDS_PER_PAYLOAD` + 1 of their
+        IDs are fetched, to invalidate them; past that, the whole table is
+        invalidated, and every instance of the model in `db` expired.
         """
-        async with db.begin_nested():
-            obj = await db.get(self.model, id)
-            logger.debug(f"=== DELETE {type(obj).__name__}")
-            await db.delete(obj)
+        if soft:
+            if not issubclass(self.model, SoftDeleteMixin):
+                raise TypeError(f"{self.model.__name__} is not soft-deletable")
+            stmt = (
+                sa_update(self.model)
+                .where(*criteria)
+                .values(deleted_at=utc_now_aware())
+            )
+        else:
+            stmt = sa_delete(self.model).where(*criteria)
 
-        logger.info(f"=== SUCCESSFUL DELETE {type(obj).__name__}")
+        # Data-modifying CTEs run to completion whatever the LIMIT.
+        affected = stmt.returning(self.model.id).cte("affected")
+        result = await db.execute(
+            select(affected.c.id, func.count().over()).limit(NOTIFY_IDS_PER_PAYLOAD + 1)
+        )
+        rows = result.all()
+        ids = [id for id, _ in rows]
+        count = rows[0][1] if rows else 0
 
-    async def quasi_delete(self, db: AsyncSession, *, id: _python_ULID) -> None:
-        """
-        Quasi-delete a record.
-        """
-        async with db.begin_nested():
-            obj = await db.get(self.model, id)
+        # Bulk DML in a CTE leaves the identity map as it was.
+        flush = count > NOTIFY_IDS_PER_PAYLOAD
+        for obj in list(db.identity_map.values()):
+            if isinstance(obj, self.model) and (flush or obj.id in ids):
+                db.expire(obj)
+
+        await self._cache_invalidate(db, ids)
+        if debug_enabled():
             logger.debug(
-                f"=== quasi-DELETE {type(obj).__name__} by setting column `deleted_at`"
+                "=== {}DELETE {} x {}",
+                "quasi-" if soft else "",
+                self.model.__name__,
+                count,
             )
-            obj.deleted_at = utc_now_aware()
+        return count
+
+    async def delete(
+        self, db: AsyncSession, *, id: _python_ULID, soft: bool = False
+    ) -> bool:
+        """
+        Delete a record by ID in a single statement; see `delete_where`.
+        Returns False if there was no such record.
+        """
+        return bool(await self.delete_where(db, self.model.id == id, soft=soft))
+
+    async def quasi_delete(self, db: AsyncSession, *, id: _python_ULID) -> bool:
+        """
+        Quasi-delete a record by setting column `deleted_at`.
+        """
+        return await self.delete(db, id=id, soft=True)
+
+    async def purge_deleted(
+        self, db: AsyncSession, *, before: datetime.datetime, limit: int = 1000
+    ) -> List[_python_ULID]:
+        """
+        Hard-delete up to `limit` records soft-deleted before `before`, oldest
+        first. Rows locked by a concurrent purge are skipped.
+        """
+        batch = (
+            select(self.model.id)
+            .where(self.model.deleted_at < before)
+            .order_by(self.model.deleted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            sa_delete(self.model)
+            .where(self.model.id.in_(batch.scalar_subquery()))
+            .returning(self.model.id)
+            .execution_options(include_deleted=True, synchronize_session=False)
+        )
+        return list(result.scalars())
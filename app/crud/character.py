@@ -1,32 +1,144 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    bindparam,
+    func,
+    literal_column,
+    or_,
+    select,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.base import ExecutableOption
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.crud.base import CRUDBase
-from app.models.character import Character
+from app.models.character import SEARCH_CONFIG, Character
 from app.schemas.character import CharacterCreate, CharacterUpdate
 
+SearchEngine = Literal["ilike", "trigram", "fts"]
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
 
 class CRUDCharacter(CRUDBase[Character, CharacterCreate, CharacterUpdate]):
+    search_fields = ("name", "default_outfit")
+
+    def where_search(self, query: Select, term: str, *, engine: SearchEngine) -> Select:
+        """
+        Restrict `query` to characters matching `term` on their name or
+        default outfit, each engine served by a GIN index:
+
+        * `ilike`: case-insensitive substring match (trigram index)
+        * `trigram`: substring or fuzzy word match, tolerating typos
+        * `fts`: every word of `term`, in web search syntax (tsvector index)
+
+        Values are bound by the names `search_params` gives them.
+        """
+        params = self.search_params(term, engine=engine)
+        if engine == "fts":
+            return query.where(
+                Character.search_vector.bool_op("@@")(self._tsquery(params))
+            )
+
+        columns = [getattr(Character, field) for field in self.search_fields]
+        pattern = bindparam("search_pattern", params["search_pattern"])
+        substring = [c.ilike(pattern, escape="\\") for c in columns]
+        if engine == "ilike":
+            return query.where(or_(*substring))
+        # `term <% column`: some word of column is similar to term.
+        fuzzy = [self._term(params).op("<%")(c) for c in columns]
+        return query.where(or_(*substring, *fuzzy))
+
+    def search_params(self, term: str, *, engine: SearchEngine) -> Dict[str, Any]:
+        """
+        Bind parameters of `where_search` and `search_rank`, by name.
+        """
+        params = {}
+        if engine != "ilike":
+            params["search_term"] = term
+        if engine != "fts":
+            params["search_pattern"] = _like_pattern(term)
+        return params
+
+    def search_rank(
+        self, term: str, *, engine: SearchEngine
+    ) -> Optional[ColumnElement[float]]:
+        """
+        Relevance of a `where_search` match, higher is better; None for
+        `ilike`, which has no notion of it.
+        """
+        params = self.search_params(term, engine=engine)
+        if engine == "trigram":
+            return func.greatest(
+                *(
+                    func.word_similarity(self._term(params), getattr(Character, field))
+                    for field in self.search_fields
+                )
+            )
+        if engine == "fts":
+            # Cover density, with name matches weighted above outfit ones.
+            return func.ts_rank_cd(Character.search_vector, self._tsquery(params))
+        return None
+
+    @staticmethod
+    def _term(params: Dict[str, Any]) -> ColumnElement[str]:
+        return bindparam("search_term", params["search_term"], type_=String)
+
+    @classmethod
+    def _tsquery(cls, params: Dict[str, Any]) -> ColumnElement:
+        return func.websearch_to_tsquery(
+            literal_column(f"'{SEARCH_CONFIG}'::regconfig"), cls._term(params)
+        )
+
     async def get_by_name(self, db: AsyncSession, *, name: str) -> Optional[Character]:
         """
         Get a character by name.
         """
+        character = await self._cache_lookup(db, "name", name)
+        if character is not None:
+            return character
+
         result = await db.execute(select(Character).filter(Character.name == name))
-        return result.scalars().first()
+        character = result.scalars().first()
+        if character is not None:
+            self._cache_put(character, "name")
+        return character
 
     async def get_multi_by_ids(
-        self, db: AsyncSession, *, ids: List[UUID], skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        ids: List[UUID],
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[ExecutableOption] = (),
     ) -> List[Character]:
         """
         Get multiple characters by IDs.
         """
         result = await db.execute(
-            select(Character).filter(Character.id.in_(ids)).offset(skip).limit(limit)
+            select(Character)
+            .filter(self._id_any(ids))
+            .options(*options)
+            .offset(skip)
+            .limit(limit)
         )
-        return result.scalars().all()
+        return result.unique().scalars().all()
 
 
-character_crud = CRUDCharacter(Character)
+character_crud = CRUDCharacter(
+    Character,
+    cache=(
+        TTLCache(maxsize=settings.CACHE_MAXSIZE, ttl=settings.CACHE_TTL)
+        if settings.CACHE_ENABLED
+        else None
+    ),
+)
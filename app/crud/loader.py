@@ -0,0 +1,76 @@
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesce `load(key)` calls made within one event-loop tick into a single
+    `batch_load_fn(keys)` call.
+
+    Results are not cached: every tick goes back to the batch function, so
+    writes made in between are always visible. Batches are dispatched one at a
+    time, which keeps a shared `AsyncSession` free of concurrent operations.
+    """
+
+    def __init__(
+        self,
+        batch_load_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        *,
+        max_batch_size: int = 1000,
+    ):
+        self.batch_load_fn = batch_load_fn
+        self.max_batch_size = max_batch_size
+        self._queue: List[Tuple[K, asyncio.Future]] = []
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, key: K) -> Awaitable[Optional[V]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((key, future))
+        if len(self._queue) == 1:
+            loop.call_soon(self._schedule)
+        return future
+
+    def _schedule(self) -> None:
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            task = asyncio.create_task(
+                self._dispatch(queue[start : start + self.max_batch_size])
+            )
+            # Keep a reference until done, the loop only holds weak ones.
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, queue: List[Tuple[K, asyncio.Future]]) -> None:
+        keys = list(dict.fromkeys(key for key, _ in queue))
+        try:
+            async with self._lock:
+                results = await self.batch_load_fn(keys)
+        except Exception as e:
+            for _, future in queue:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Cancelled: the callers would otherwise wait forever.
+            for _, future in queue:
+                future.cancel()
+            raise
+
+        for key, future in queue:
+            if not future.done():
+                future.set_result(results.get(key))
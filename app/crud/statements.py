@@ -0,0 +1,66 @@
+"""Statements built once per shape.
+
+SQLAlchemy caches compiled SQL by statement structure, but the statement is
+still built, and its cache key computed, on every request; for a filtered list
+that costs more than the compilation it saves. A `StatementCache` keeps one
+statement per shape (which filters are set, the ordering, the relationships
+loaded), with every value a named bind parameter, and hands back the same
+object each time, so its cache key is memoized and compilation is a lookup.
+Values go in as execution parameters. Each shape also sends one SQL text,
+which asyncpg's prepared statement cache (`DB_STATEMENT_CACHE_SIZE`) serves
+without preparing it again.
+
+See `python -m benchmarks.statements`.
+"""
+
+import math
+from typing import Any, Callable, Dict, Hashable, Iterable, List, TypeVar
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Executable
+
+from app.core.cache import TTLCache
+
+StatementT = TypeVar("StatementT", bound=Executable)
+
+
+def unbound_values(statement: Executable, params: Iterable[str]) -> List[str]:
+    """
+    Bind parameters of `statement` not named in `params`: values baked in
+    when it was built, which a reused statement would repeat.
+    """
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return sorted(set(compiled.binds) - set(params))
+
+
+class StatementCache:
+    def __init__(self, maxsize: int = 256):
+        """
+        Bounded LRU of statements by shape.
+        """
+        self._statements = TTLCache(maxsize=maxsize, ttl=math.inf)
+
+    def get(
+        self,
+        shape: Hashable,
+        build: Callable[[], StatementT],
+        params: Iterable[str] = (),
+    ) -> StatementT:
+        """
+        The statement for `shape`, from `build` on first use. Raises
+        `ValueError` if it holds a value not bound by one of the `params`
+        names, which would leak into every later request of the shape.
+        """
+        statement = self._statements.get(shape)
+        if statement is None:
+            statement = build()
+            unbound = unbound_values(statement, params)
+            if unbound:
+                raise ValueError(
+                    f"Statement for shape {shape!r} has unnamed values: {unbound}"
+                )
+            self._statements.set(shape, statement)
+        return statement
+
+    def stats(self) -> Dict[str, Any]:
+        return self._statements.stats()
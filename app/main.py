@@ -1,16 +1,62 @@
+import datetime
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi_pagination import add_pagination
 
 from app.api.v1.router import api_router as api_v1_router
+from app.core.cache import CacheInvalidationListener
 from app.core.config import settings
+from app.core.database import SessionLocal, engine, replicas
+from app.core.instrumentation import QueryStatsMiddleware, render_metrics
+from app.core.logging import RequestContextMiddleware, configure_logging
+from app.core.replicas import ReadYourWritesMiddleware
+from app.core.responses import DefaultJSONResponse
+from app.crud.character import character_crud
+from app.services.compaction import TombstoneCompactor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener = None
+    if settings.CACHE_ENABLED:
+        listener = CacheInvalidationListener(
+            dsn=str(settings.DATABASE_URL).replace("+asyncpg", "", 1),
+            channel=settings.CACHE_NOTIFY_CHANNEL,
+        )
+        await listener.start()
+    if replicas.engines:
+        await replicas.start()
+    compactor = None
+    if settings.SOFT_DELETE_COMPACTION_INTERVAL > 0:
+        compactor = TombstoneCompactor(
+            SessionLocal,
+            [character_crud],
+            retention=datetime.timedelta(days=settings.SOFT_DELETE_RETENTION_DAYS),
+            interval=settings.SOFT_DELETE_COMPACTION_INTERVAL,
+            batch_size=settings.SOFT_DELETE_COMPACTION_BATCH_SIZE,
+        )
+        await compactor.start()
+    try:
+        yield
+    finally:
+        if compactor is not None:
+            await compactor.stop()
+        await replicas.stop()
+        if listener is not None:
+            await listener.stop()
 
 
 def get_app() -> FastAPI:
+    configure_logging()
+
     app = FastAPI(
         title=settings.PROJECT_NAME,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
+        lifespan=lifespan,
+        default_response_class=DefaultJSONResponse,
     )
 
     # Set up CORS
@@ -23,12 +69,22 @@ def get_app() -> FastAPI:
             allow_headers=["*"],
         )
 
-    # Add pagination
-    add_pagination(app)
+    # Per-request SQL statement count and time, see `app.core.instrumentation`
+    app.add_middleware(QueryStatsMiddleware)
+    # Reads from the primary right after a client writes, see `app.core.replicas`
+    app.add_middleware(
+        ReadYourWritesMiddleware, window=settings.DB_READ_YOUR_WRITES_WINDOW
+    )
+    # Correlation ID and per-request debug tracing, see `app.core.logging`;
+    # added last so it wraps everything that logs
+    app.add_middleware(RequestContextMiddleware)
 
     # Include routers
     app.include_router(api_v1_router, prefix=settings.API_V1_STR)
 
+    # Add pagination; after the routers, so their page routes get params
+    add_pagination(app)
+
     @app.get("/")
     async def root():
         return JSONResponse(
@@ -39,6 +95,13 @@ def get_app() -> FastAPI:
             }
         )
 
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(
+            render_metrics(engine.pool.stats()),
+            media_type="text/plain; version=0.0.4",
+        )
+
     return app
 
 
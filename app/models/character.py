@@ -1,30 +1,37 @@
-from datetime import UTC, datetime
+from datetime import datetime
 from typing import List, Optional
 
 import sqlalchemy as sa
 import ulid
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
+from app.core.ulid_gen import ulid_generator
+from app.utils.datetime import utc_now_aware
 
-from .types import ULIDType
+from .mixins import SoftDeleteMixin, live_index, soft_delete_indexes
+from .types import ulid_server_default, ulid_type
+
+# Text search configuration behind `Character.search_vector`. Names are proper
+# nouns in any language, so words are indexed as-is rather than stemmed.
+SEARCH_CONFIG = "simple"
 
 
 class Disposition(Base):
     id: Mapped[ulid.ULID] = mapped_column(
-        ULIDType(),
+        ulid_type(),
         nullable=False,
         primary_key=True,
-        default=ulid.ULID,
-        server_default=sa.text("gen_ulid()"),
+        default=ulid_generator.next,
+        server_default=ulid_server_default(),
     )
     category: Mapped[str] = mapped_column(sa.String, nullable=False)
     trait: Mapped[str] = mapped_column(sa.String, nullable=False)
 
     # Foreign key to Character
     character_id: Mapped[ulid.ULID] = mapped_column(
-        ULIDType(), sa.ForeignKey("character.id"), nullable=False
+        ulid_type(), sa.ForeignKey("character.id", ondelete="CASCADE"), nullable=False
     )
 
     # Relationship back to Character
@@ -33,28 +40,76 @@ class Disposition(Base):
     )
 
 
-class Character(Base):
+class Character(SoftDeleteMixin, Base):
+    __table_args__ = (
+        # Names of deleted characters can be reused.
+        live_index("character_name_key", "name", unique=True),
+        *soft_delete_indexes("character"),
+        # `custom_search`, see `CRUDCharacter.where_search`
+        live_index(
+            "character_search_vector_idx", "search_vector", postgresql_using="gin"
+        ),
+        live_index(
+            "character_name_trgm_idx",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        live_index(
+            "character_default_outfit_trgm_idx",
+            "default_outfit",
+            postgresql_using="gin",
+            postgresql_ops={"default_outfit": "gin_trgm_ops"},
+        ),
+        # `extra_*` filters, see `CRUDBase.where_jsonb`
+        live_index(
+            "character_extra_variables_idx",
+            "extra_variables",
+            postgresql_using="gin",
+            postgresql_ops={"extra_variables": "jsonb_path_ops"},
+        ),
+    )
+
     id: Mapped[ulid.ULID] = mapped_column(
-        ULIDType(),
+        ulid_type(),
         nullable=False,
         primary_key=True,
-        default=ulid.ULID,
-        server_default=sa.text("gen_ulid()"),
+        default=ulid_generator.next,
+        server_default=ulid_server_default(),
     )
     name: Mapped[str] = mapped_column(sa.String, nullable=False)
     description: Mapped[str] = mapped_column(sa.Text, nullable=False)
     default_outfit: Mapped[str] = mapped_column(sa.Text, nullable=True)
     extra_variables: Mapped[dict] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        sa.TIMESTAMP(timezone=True), default=datetime.now(UTC)
+        sa.TIMESTAMP(timezone=True), default=utc_now_aware
     )
     updated_at: Mapped[datetime] = mapped_column(
         sa.TIMESTAMP(timezone=True),
-        default=datetime.now(UTC),
-        onupdate=datetime.now(UTC),
+        default=utc_now_aware,
+        onupdate=utc_now_aware,
+    )
+
+    # Maintained by PostgreSQL; only ever read in WHERE / ORDER BY clauses.
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        sa.Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')"
+            f" || setweight(to_tsvector('{SEARCH_CONFIG}',"
+            " coalesce(default_outfit, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
     )
 
     # Relationships
     dispositions: Mapped[List["Disposition"]] = relationship(
         "Disposition", back_populates="character"
     )
+
+
+sa.event.listen(
+    Character.__table__,
+    "before_create",
+    sa.DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
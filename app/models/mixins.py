@@ -0,0 +1,84 @@
+"""Soft deletion.
+
+Rows of `SoftDeleteMixin` models are deleted by stamping `deleted_at`. Every
+ORM SELECT, UPDATE and DELETE against them is scoped to live rows, unless run
+with the `include_deleted=True` execution option; tombstones are purged after
+a retention period by `app.services.compaction`. Statements executed many
+times are scoped once up front with `live_rows`.
+"""
+
+from datetime import datetime
+from typing import Optional, Tuple, TypeVar
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import (
+    Mapped,
+    ORMExecuteState,
+    Session,
+    mapped_column,
+    with_loader_criteria,
+)
+from sqlalchemy.sql import Executable
+
+StatementT = TypeVar("StatementT", bound=Executable)
+
+LIVE = sa.text("deleted_at IS NULL")
+TOMBSTONE = sa.text("deleted_at IS NOT NULL")
+
+
+class SoftDeleteMixin:
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(
+        sa.TIMESTAMP(timezone=True), nullable=True, default=None
+    )
+
+
+def live_index(name: str, *expressions, **kw) -> sa.Index:
+    """
+    Partial index over live rows only, so tombstones never bloat it.
+    """
+    return sa.Index(name, *expressions, postgresql_where=LIVE, **kw)
+
+
+def live_id_index_name(table_name: str) -> str:
+    return f"{table_name}_id_live_idx"
+
+
+def soft_delete_indexes(table_name: str) -> Tuple[sa.Index, sa.Index]:
+    """
+    Primary key index over live rows, for ID lookups and ranges, and one over
+    tombstones by age, for compaction.
+    """
+    return (
+        live_index(live_id_index_name(table_name), "id"),
+        sa.Index(
+            f"{table_name}_deleted_at_idx", "deleted_at", postgresql_where=TOMBSTONE
+        ),
+    )
+
+
+def _live_criteria():
+    return with_loader_criteria(
+        SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True
+    )
+
+
+def live_rows(statement: StatementT) -> StatementT:
+    """
+    `statement` scoped to live rows once, rather than by the hook below on
+    each execution, which derives a new statement every time and so defeats
+    reusing one; see `app.crud.statements`.
+    """
+    return statement.options(_live_criteria()).execution_options(live_rows_only=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_live_rows(state: ORMExecuteState) -> None:
+    if (
+        (state.is_select or state.is_update or state.is_delete)
+        and not state.is_column_load
+        and not state.is_relationship_load
+        and not state.execution_options.get("include_deleted", False)
+        and not state.execution_options.get("live_rows_only", False)
+    ):
+        state.statement = state.statement.options(_live_criteria())
@@ -1,13 +1,16 @@
+import operator
 import uuid
 from typing import Literal
 
 import ulid
-from sqlalchemy import types, util
+from sqlalchemy import TextClause, text, types, util
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.sql.type_api import UserDefinedType
 from sqlalchemy_utils.types.scalar_coercible import ScalarCoercible
 from ulid import ULID as _python_ULID
 
+from app.core.config import settings
+
 
 class _ULIDScalarCoercible(ScalarCoercible):
     @staticmethod
@@ -15,14 +18,22 @@ class _ULIDScalarCoercible(ScalarCoercible):
         if not value:
             return None
 
-        if isinstance(value, str):
-            try:
-                value = ulid.ULID.from_str(value)
-            except (TypeError, ValueError):
-                value = ulid.ULID.from_hex(value)
-
+        if isinstance(value, ulid.ULID):
             return value
 
+        if isinstance(value, str):
+            # Dispatch on length instead of try/except: 26 chars is Crockford
+            # base32, 32 is hex, 36 is the canonical UUID form.
+            match len(value):
+                case 26:
+                    return ulid.ULID.from_str(value)
+                case 32:
+                    return ulid.ULID.from_hex(value)
+                case 36:
+                    return ulid.ULID.from_uuid(uuid.UUID(value))
+                case _:
+                    raise ValueError(f"Unrecognized ULID string [{value}]")
+
         if isinstance(value, int):
             return ulid.ULID.from_int(value)
 
@@ -41,6 +52,8 @@ class _ULIDScalarCoercible(ScalarCoercible):
 class UserDefinedULIDType(_ULIDScalarCoercible, UserDefinedType):
     cache_ok = True
 
+    python_type = _python_ULID
+
     def __init__(self):
         super().__init__()
 
@@ -52,6 +65,16 @@ class UserDefinedULIDType(_ULIDScalarCoercible, UserDefinedType):
         return "ulid"
 
     def bind_processor(self, dialect):
+        if getattr(dialect, "supports_native_ulid", False):
+            # The asyncpg codec encodes `ulid.ULID` itself, see `app.core.codecs`.
+            def process(value) -> ulid.ULID | None:
+                if value is None or isinstance(value, ulid.ULID):
+                    return value
+
+                return self._coerce(value)
+
+            return process
+
         def process(value) -> str | None:
             if value is None:
                 return value
@@ -65,6 +88,10 @@ class UserDefinedULIDType(_ULIDScalarCoercible, UserDefinedType):
         return process
 
     def result_processor(self, dialect, coltype):
+        if getattr(dialect, "supports_native_ulid", False):
+            # The driver already returns `ulid.ULID`; skip per-row work.
+            return None
+
         def process(value) -> ulid.ULID | None:
             if value is None:
                 return value
@@ -73,6 +100,15 @@ class UserDefinedULIDType(_ULIDScalarCoercible, UserDefinedType):
 
         return process
 
+    def literal_processor(self, dialect):
+        def process(value) -> str:
+            if not isinstance(value, ulid.ULID):
+                value = self._coerce(value)
+
+            return f"'{value}'::ulid"
+
+        return process
+
 
 class DifferedULIDType(_ULIDScalarCoercible, types.TypeDecorator):
     """
@@ -81,9 +117,6 @@ class DifferedULIDType(_ULIDScalarCoercible, types.TypeDecorator):
 
     cache_ok = True
 
-    # impl = postgresql.UUID(as_uuid=True)
-    # impl = postgresql.CHAR(26)
-    # impl = postgresql.BYTEA(16)
     impl: postgresql.UUID | postgresql.CHAR | postgresql.BYTEA
 
     python_type = _python_ULID
@@ -96,7 +129,7 @@ class DifferedULIDType(_ULIDScalarCoercible, types.TypeDecorator):
             case "byte":
                 self.impl = postgresql.BYTEA(16)
             case "char":
-                self.imp = postgresql.CHAR(26)
+                self.impl = postgresql.CHAR(26)
             case _:
                 raise ValueError(f"Invalid param `column_type` [{column_type}]")
 
@@ -104,31 +137,124 @@ class DifferedULIDType(_ULIDScalarCoercible, types.TypeDecorator):
         return util.generic_repr(self)
 
     def load_dialect_impl(self, dialect):
-        if self.column_type == "char":
-            return dialect.type_descriptor(types.UnicodeText)
         return dialect.type_descriptor(self.impl)
 
-    def process_bind_param(self, value, dialect) -> bytes | None:
-        if value is None:
-            return value
+    # The processors below replace the `TypeDecorator` chain instead of
+    # feeding `impl`: each storage converts in a single step, and asyncpg
+    # returns `uuid`, `bytea` and `char` values that need no further work.
 
-        if not isinstance(value, ulid.ULID):
-            value = self._coerce(value)
+    def bind_processor(self, dialect):
+        match self.column_type:
+            case "uuid":
+                to_db = _python_ULID.to_uuid
+            case "byte":
+                to_db = operator.attrgetter("bytes")
+            case "char":
+                to_db = str
+
+        def process(value):
+            if value is None:
+                return value
+
+            if not isinstance(value, ulid.ULID):
+                value = self._coerce(value)
+
+            return to_db(value)
+
+        return process
+
+    def result_processor(self, dialect, coltype):
+        match self.column_type:
+            case "uuid":
+                # asyncpg's own UUID class; anything exposing `.bytes` works.
+                def process(value) -> ulid.ULID | None:
+                    if value is None:
+                        return value
+
+                    return _python_ULID(value.bytes)
+
+            case "byte":
+
+                def process(value) -> ulid.ULID | None:
+                    if value is None:
+                        return value
+
+                    return _python_ULID(bytes(value))
+
+            case "char":
 
+                def process(value) -> ulid.ULID | None:
+                    if value is None:
+                        return value
+
+                    return _python_ULID.from_str(value)
+
+        return process
+
+    def literal_processor(self, dialect):
         match self.column_type:
             case "uuid":
-                return str(value)
+                to_literal = "'{}'::uuid".format
+                to_db = _python_ULID.to_uuid
             case "byte":
-                return value.bytes
+                to_literal = "'\\x{}'::bytea".format
+                to_db = operator.attrgetter("hex")
             case "char":
-                return str(value)
+                to_literal = "'{}'".format
+                to_db = str
 
-    def process_result_value(self, value, dialect) -> ulid.ULID | None:
-        if value is None:
-            return value
+        def process(value) -> str:
+            if not isinstance(value, ulid.ULID):
+                value = self._coerce(value)
+
+            return to_literal(to_db(value))
+
+        return process
+
+
+def coerce_ulid(value) -> ulid.ULID | None:
+    """
+    `value` as a ULID, from any form a ULID column binds: str, UUID, int, bytes.
+    """
+    return _ULIDScalarCoercible._coerce(value)
 
-        return self._coerce(value)
 
+ULIDStorage = Literal["ulid", "uuid", "byte", "char"]
 
+# `gen_ulid()` from the pgx_ulid extension, cast to each storage type.
+_SERVER_DEFAULTS: dict[str, str] = {
+    "ulid": "gen_ulid()",
+    "uuid": "gen_ulid()::uuid",
+    "byte": "uuid_send(gen_ulid()::uuid)",
+    "char": "gen_ulid()::text",
+}
+
+
+# What the migrations name: their history is written in pgx_ulid `ulid` storage.
 ULIDType = UserDefinedULIDType
-# ULIDType = DifferedULIDType
+
+
+def ulid_type(storage: ULIDStorage | None = None) -> types.TypeEngine:
+    """
+    The primary key column type for `storage`, by default `ULID_STORAGE`.
+
+    Models call this rather than naming a storage class. Migrations build
+    `ulid` storage; a fresh database in another one is bootstrapped from the
+    models, see `app.utils.bootstrap`.
+    """
+    storage = storage or settings.ULID_STORAGE
+    if storage == "ulid":
+        return UserDefinedULIDType()
+    return DifferedULIDType(storage)
+
+
+def ulid_server_default(storage: ULIDStorage | None = None) -> TextClause:
+    """
+    `server_default` generating a ULID in the column type of `storage`.
+    """
+    return text(_SERVER_DEFAULTS[storage or settings.ULID_STORAGE])
+
+
+def is_ulid_server_default(default) -> bool:
+    arg = getattr(default, "arg", default)
+    return getattr(arg, "text", None) in _SERVER_DEFAULTS.values()
@@ -2,17 +2,22 @@ from __future__ import annotations
 
 from typing import Literal, Optional, TypeVar, overload
 
-from sqlalchemy.sql.type_api import Emulated, TypeEngine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import elements, operators
+from sqlalchemy.sql.type_api import TypeEngine
 from ulid import ULID as _python_ULID
 
 _ULID_RETURN = TypeVar("_ULID_RETURN", str, _python_ULID)
 
 
-class Ulid(Emulated, TypeEngine[_ULID_RETURN]):
+class Ulid(TypeEngine[_ULID_RETURN]):
     __visit_name__ = "ulid"
 
     collation: Optional[str] = None
 
+    cache_ok = True
+
     @overload
     def __init__(
         self: Ulid[_python_ULID],
@@ -28,18 +33,14 @@ class Ulid(Emulated, TypeEngine[_ULID_RETURN]):
     ): ...
 
     def __init__(self, as_ulid: bool = True, native_ulid: bool = True):
-        """Construct a :class:`_sqltypes.Uuid` type.
-
-        :param as_uuid=True: if True, values will be interpreted
-         as Python uuid objects, converting to/from string via the
-         DBAPI.
+        """Construct a :class:`.Ulid` type.
 
+        :param as_ulid=True: if True, values will be interpreted
+         as python-ulid ``ULID`` objects, otherwise as 26 character strings.
 
-        :param native_uuid=True: if True, backends that support either the
-         ``UUID`` datatype directly, or a UUID-storing value
-         (such as SQL Server's ``UNIQUEIDENTIFIER`` will be used by those
-         backends.   If False, a ``CHAR(32)`` datatype will be used for
-         all backends regardless of native support.
+        :param native_ulid=True: if True, PostgreSQL stores values in the
+         pgx_ulid ``ulid`` type. If False, or on any other backend, a
+         ``CHAR(26)`` datatype is used.
 
         """
         self.as_ulid = as_ulid
@@ -53,91 +54,116 @@ class Ulid(Emulated, TypeEngine[_ULID_RETURN]):
     def native(self):
         return self.native_ulid
 
+    class Comparator(TypeEngine.Comparator[_ULID_RETURN]):
+        def operate(self, op, *other, **kwargs):
+            return super().operate(
+                op, *(self._typed_collection(o) for o in other), **kwargs
+            )
+
+        def _typed_collection(self, other):
+            """
+            Type an untyped bind inside `ANY(...)` / `ALL(...)` as an array of
+            this column's type, so its values get the same conversion as an
+            `IN` list instead of reaching the driver as-is.
+
+            Only `column == any_(...)` passes through here; the mirrored
+            `any_(...) == column` is dispatched on the aggregate's own type.
+            """
+            if not isinstance(other, elements.CollectionAggregate):
+                return other
+
+            bind = other.element
+            if isinstance(bind, elements.Grouping):
+                bind = bind.element
+            if not (isinstance(bind, elements.BindParameter) and bind.type._isnull):
+                return other
+
+            bind = bind._clone()
+            bind.type = postgresql.ARRAY(self.type)
+            if other.operator is operators.any_op:
+                return elements.CollectionAggregate._create_any(bind)
+            return elements.CollectionAggregate._create_all(bind)
+
+    comparator_factory = Comparator
+
     def coerce_compared_value(self, op, value):
         """See :meth:`.TypeEngine.coerce_compared_value` for a description."""
 
-        if isinstance(value, str):
+        if isinstance(value, (str, _python_ULID)):
+            # Each element of an `IN` list arrives here too.
             return self
-        else:
-            return super().coerce_compared_value(op, value)
+        if isinstance(value, (list, tuple)):
+            return postgresql.ARRAY(self)
+        return super().coerce_compared_value(op, value)
 
-    def bind_processor(self, dialect):
-        character_based_ulid = not dialect.supports_native_ulid or not self.native_ulid
+    def _native_column(self, dialect) -> bool:
+        return dialect.name == "postgresql" and self.native_ulid
 
-        if character_based_ulid:
-            if self.as_ulid:
+    def _driver_speaks_ulid(self, dialect) -> bool:
+        # Set by `app.core.codecs.register_ulid_codec`.
+        return self._native_column(dialect) and getattr(
+            dialect, "supports_native_ulid", False
+        )
 
-                def process(value):
-                    if value is not None:
-                        value = value.hex
-                    return value
+    def bind_processor(self, dialect):
+        if self._driver_speaks_ulid(dialect):
+            # The codec encodes both `ULID` and its string form.
+            return None
 
-                return process
-            else:
+        if self.as_ulid:
 
-                def process(value):
-                    if value is not None:
-                        value = value.replace("-", "")
-                    return value
+            def process(value):
+                if value is not None and not isinstance(value, str):
+                    value = str(value)
+                return value
 
-                return process
+            return process
         else:
             return None
 
     def result_processor(self, dialect, coltype):
-        character_based_ulid = not dialect.supports_native_ulid or not self.native_ulid
-
-        if character_based_ulid:
+        if self._driver_speaks_ulid(dialect):
             if self.as_ulid:
+                return None
 
-                def process(value):
-                    if value is not None:
-                        value = _python_ULID(value)
-                    return value
-
-                return process
-            else:
+            def process(value):
+                if value is not None:
+                    value = str(value)
+                return value
 
-                def process(value):
-                    if value is not None:
-                        value = str(_python_ULID(value))
-                    return value
+            return process
 
-                return process
-        else:
-            if not self.as_ulid:
+        if self.as_ulid:
 
-                def process(value):
-                    if value is not None:
-                        value = str(value)
-                    return value
+            def process(value):
+                if value is not None:
+                    value = _python_ULID.from_str(value)
+                return value
 
-                return process
-            else:
-                return None
+            return process
+        else:
+            return None
 
     def literal_processor(self, dialect):
-        character_based_ulid = not dialect.supports_native_ulid or not self.native_ulid
-
-        if not self.as_ulid:
+        if self._native_column(dialect):
 
             def process(value):
-                return f"""'{value.replace("-", "").replace("'", "''")}'"""
+                return f"""'{str(value).replace("'", "''")}'::ulid"""
 
             return process
         else:
-            if character_based_ulid:
 
-                def process(value):
-                    return f"""'{value.hex}'"""
+            def process(value):
+                return f"""'{str(value).replace("'", "''")}'"""
+
+            return process
 
-                return process
-            else:
 
-                def process(value):
-                    return f"""'{str(value).replace("'", "''")}'"""
+@compiles(Ulid)
+def _compile_ulid(type_, compiler, **kw):
+    return "CHAR(26)"
 
-                return process
 
-    def compile(self, dialect=None):
-        return "ulid"  # Not working
+@compiles(Ulid, "postgresql")
+def _compile_ulid_postgresql(type_, compiler, **kw):
+    return "ulid" if type_.native_ulid else "CHAR(26)"
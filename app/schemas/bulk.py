@@ -0,0 +1,42 @@
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from .ulid import ULID
+
+
+class BulkRowStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    skipped = "skipped"
+
+
+class BulkRowResult(BaseModel):
+    index: int
+    id: Optional[ULID] = None
+    status: BulkRowStatus
+
+
+class BulkResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    rows: List[BulkRowResult] = []
+
+    @classmethod
+    def from_rows(cls, rows: List[BulkRowResult]) -> "BulkResult":
+        result = cls(rows=rows)
+        for row in rows:
+            match row.status:
+                case BulkRowStatus.created:
+                    result.created += 1
+                case BulkRowStatus.updated:
+                    result.updated += 1
+                case BulkRowStatus.skipped:
+                    result.skipped += 1
+        return result
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: int
@@ -1,11 +1,27 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from functools import cache
+from typing import Any, Dict, FrozenSet, List, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
 
 from .ulid import ULID
 
 
+@cache
+def _relationship_keys(mapper: Any) -> FrozenSet[str]:
+    return frozenset(mapper.relationships.keys())
+
+
+# Disposition schemas
+class Disposition(BaseModel):
+    id: ULID
+    category: str
+    trait: str
+    character_id: ULID
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 # Character schemas
 class CharacterBase(BaseModel):
     name: str
@@ -29,9 +45,44 @@ class CharacterInDBBase(CharacterBase):
     id: ULID
     created_at: datetime
     updated_at: datetime
+    dispositions: Optional[List[Disposition]] = Field(
+        None, description="Only present when requested with `include=dispositions`"
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
+    @model_validator(mode="before")
+    @classmethod
+    def skip_unloaded_relationships(cls, data: Any) -> Any:
+        """
+        Read relationships from an ORM object only if they were eagerly loaded;
+        touching an unloaded one would emit a lazy load per row.
+        """
+        # Runs once per row of every response: `InstanceState.unloaded` walks
+        # every attribute, while the instance dict holds just what was loaded.
+        state = getattr(data, "_sa_instance_state", None)
+        if state is None:
+            return data
+
+        loaded = data.__dict__
+        relationships = _relationship_keys(state.mapper)
+        if loaded.keys() >= relationships:
+            return data
+        return {
+            k: loaded[k] if k in loaded else getattr(data, k)
+            for k in cls.model_fields
+            if k in loaded or k not in relationships
+        }
+
 
 class Character(CharacterInDBBase):
     pass
+
+
+class CharacterBatchGet(BaseModel):
+    ids: List[ULID] = Field(min_length=1, max_length=100)
+
+
+class CharacterBatch(BaseModel):
+    items: List[Character]
+    missing: List[ULID] = []
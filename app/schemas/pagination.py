@@ -0,0 +1,51 @@
+from math import ceil
+from typing import Any, Generic, List, Literal, Optional, Sequence, TypeVar
+
+from fastapi_pagination.bases import AbstractParams
+from fastapi_pagination.links import Page
+from fastapi_pagination.links.bases import create_links
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# How a page's `total` is obtained, see `CRUDBase.count`.
+CountMode = Literal["exact", "estimated", "cached", "none"]
+
+
+class KeysetPage(BaseModel, Generic[T]):
+    items: List[T]
+    current_page: Optional[str] = None
+    next_page: Optional[str] = None
+    previous_page: Optional[str] = None
+
+
+class CountedPage(Page[T], Generic[T]):
+    """
+    Offset page whose `total` may be approximate, or null with `count_mode`
+    `none`. `has_next` and the `next` link come from the rows themselves, so
+    they hold whatever the count.
+    """
+
+    count_mode: CountMode
+    has_next: bool
+
+    @classmethod
+    def create(
+        cls,
+        items: Sequence[T],
+        params: AbstractParams,
+        *,
+        total: Optional[int] = None,
+        has_next: bool = False,
+        **kwargs: Any,
+    ) -> "CountedPage[T]":
+        page, size = params.page, params.size
+        links = create_links(
+            first={"page": 1},
+            last={"page": max(ceil(total / size), 1)} if total is not None else None,
+            next={"page": page + 1} if has_next else None,
+            prev={"page": page - 1} if page > 1 else None,
+        )
+        return super().create(
+            items, params, total=total, has_next=has_next, links=links, **kwargs
+        )
@@ -0,0 +1,35 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    timeout: float
+    checkouts: int
+    timeouts: int
+    wait_total_seconds: float
+    wait_max_seconds: float
+    wait_avg_seconds: float
+
+
+class ReplicaStats(BaseModel):
+    url: str
+    lag_seconds: Optional[float]
+    healthy: bool
+    reads: int
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
@@ -21,6 +21,16 @@ except ModuleNotFoundError as e:  # pragma: no cover
 
 UlidType = Union[str, bytes, int]
 
+# Crockford base32 digit pairs, so a ULID encodes in 13 lookups instead of the
+# 26 per-character steps `str(ulid)` takes.
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_PAIRS = [a + b for a in _CROCKFORD for b in _CROCKFORD]
+
+
+def _encode(ulid: _ULID) -> str:
+    n = int.from_bytes(ulid.bytes, "big")
+    return "".join([_PAIRS[(n >> shift) & 0x3FF] for shift in range(120, -1, -10)])
+
 
 @dataclass
 class ULID(_repr.Representation):
@@ -34,34 +44,44 @@ class ULID(_repr.Representation):
     def __get_pydantic_core_schema__(
         cls, source: type[Any], handler: GetCoreSchemaHandler
     ) -> core_schema.CoreSchema:
-        return core_schema.no_info_wrap_validator_function(
-            function=cls._validate_ulid,
-            schema=core_schema.union_schema(
+        # ULIDs read from the database are already `ulid.ULID` instances; the
+        # `is_instance` branch accepts them inside pydantic-core, so only
+        # client input (strings, ints, bytes) pays for a Python callback.
+        from_str = core_schema.no_info_after_validator_function(
+            cls._from_str, core_schema.str_schema(min_length=26, max_length=26)
+        )
+        return core_schema.json_or_python_schema(
+            json_schema=from_str,
+            python_schema=core_schema.union_schema(
                 [
                     core_schema.is_instance_schema(_ULID),
-                    core_schema.int_schema(),
-                    core_schema.bytes_schema(),
-                    core_schema.str_schema(),
-                ]
+                    core_schema.no_info_plain_validator_function(cls._validate_ulid),
+                ],
+                mode="left_to_right",
+                custom_error_type="ulid_format",
+                custom_error_message="Unrecognized format",
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _encode, when_used="json-unless-none"
             ),
-            # NOTE: This is necessary on serialization.
-            serialization=core_schema.to_string_ser_schema(),
         )
 
     @classmethod
-    def _validate_ulid(
-        cls, value: Any, handler: core_schema.ValidatorFunctionWrapHandler
-    ) -> Any:
-        ulid: _ULID
+    def _from_str(cls, value: str) -> _ULID:
+        try:
+            return _ULID.from_str(value)
+        except ValueError as e:
+            raise PydanticCustomError("ulid_format", "Unrecognized format") from e
+
+    @classmethod
+    def _validate_ulid(cls, value: Any) -> _ULID:
         try:
             if isinstance(value, int):
-                ulid = _ULID.from_int(value)
+                return _ULID.from_int(value)
             elif isinstance(value, str):
-                ulid = _ULID.from_str(value)
-            elif isinstance(value, _ULID):
-                ulid = value
-            else:
-                ulid = _ULID.from_bytes(value)
+                return _ULID.from_str(value)
+            elif isinstance(value, bytes):
+                return _ULID.from_bytes(value)
         except ValueError as e:
             raise PydanticCustomError("ulid_format", "Unrecognized format") from e
-        return handler(ulid)
+        raise PydanticCustomError("ulid_format", "Unrecognized format")
@@ -0,0 +1,82 @@
+"""Tombstone compaction.
+
+`TombstoneCompactor` periodically hard-deletes rows soft-deleted longer ago
+than the retention period, so tombstones do not pile up in the heap. Each
+batch is its own short transaction and skips rows locked by another worker,
+so several app processes can run it side by side.
+"""
+
+import asyncio
+import contextlib
+import datetime
+from typing import Callable, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.utils.datetime import utc_now_aware
+
+
+class TombstoneCompactor:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        cruds: Sequence[CRUDBase],
+        *,
+        retention: datetime.timedelta,
+        interval: float,
+        batch_size: int = 1000,
+    ):
+        """
+        **Parameters**
+
+        * `session_factory`: Makes the session each batch runs in
+        * `cruds`: CRUD objects of soft-deletable models to compact
+        * `retention`: How long tombstones are kept
+        * `interval`: Seconds between compaction runs
+        * `batch_size`: Rows hard-deleted per transaction
+        """
+        self.session_factory = session_factory
+        self.cruds = cruds
+        self.retention = retention
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def compact(self) -> int:
+        """
+        Purge every tombstone past retention; returns the number of rows.
+        """
+        before = utc_now_aware() - self.retention
+        purged = 0
+        for crud in self.cruds:
+            while True:
+                async with self.session_factory() as db, db.begin():
+                    ids = await crud.purge_deleted(
+                        db, before=before, limit=self.batch_size
+                    )
+                purged += len(ids)
+                if len(ids) < self.batch_size:
+                    break
+        return purged
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                purged = await self.compact()
+                if purged:
+                    logger.info("Compaction purged {} tombstones", purged)
+            except Exception:
+                logger.exception("Tombstone compaction failed")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
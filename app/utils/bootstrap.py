@@ -0,0 +1,46 @@
+"""Bootstrap a fresh database in the configured `ULID_STORAGE`.
+
+    python -m app.utils.bootstrap
+
+The migrations build `ulid` storage only, so an empty database meant for
+another storage gets its schema from the models instead, and is then stamped
+at the head revision for later migrations to apply on top.
+"""
+
+import asyncio
+from pathlib import Path
+
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic import command
+from app.core.config import settings
+from app.core.database import meta
+from app.models import load_all_models
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+async def create_schema() -> None:
+    """Create every table of the models, in the configured storage."""
+    load_all_models()
+    engine = create_async_engine(str(settings.DATABASE_URL))
+    try:
+        async with engine.begin() as conn:
+            if await conn.scalar(text("SELECT to_regclass('alembic_version')")):
+                raise RuntimeError("Database is already migrated, not bootstrapping")
+            # `gen_ulid()` backs the key defaults in every storage.
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS ulid"))
+            await conn.run_sync(meta.create_all)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    asyncio.run(create_schema())
+    command.stamp(Config(str(ALEMBIC_INI)), "head")
+
+
+if __name__ == "__main__":
+    main()
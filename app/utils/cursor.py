@@ -0,0 +1,73 @@
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+import ulid
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, ulid.ULID):
+        return {"u": str(value)}
+    if isinstance(value, datetime.datetime):
+        return {"t": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "u" in value:
+            return ulid.ULID.from_str(value["u"])
+        if "t" in value:
+            return datetime.datetime.fromisoformat(value["t"])
+        raise ValueError(f"Unrecognized cursor value [{value}]")
+    return value
+
+
+def _fits(value: Any, python_type: type) -> bool:
+    # `bool` subclasses `int`, but `true` is not a valid integer bound.
+    if isinstance(value, bool) and python_type is not bool:
+        return False
+    return isinstance(value, python_type)
+
+
+def encode_cursor(
+    order: Sequence[str], values: Sequence[Any], *, backwards: bool = False
+) -> str:
+    """
+    Build an opaque keyset cursor.
+
+    `order` is the normalized ordering spec the values belong to, so a cursor
+    cannot be replayed against a different sort.
+    """
+    payload = {
+        "o": list(order),
+        "v": [_encode_value(v) for v in values],
+        "b": backwards,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(
+    cursor: str, types: Optional[Sequence[type]] = None
+) -> Tuple[List[str], List[Any], bool]:
+    """
+    Inverse of `encode_cursor`. Raises `ValueError` on malformed input.
+
+    `types` are the Python types of the key columns; a value that is not an
+    instance of its column's type is malformed too, as it would only fail
+    later in the driver.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        order = list(payload["o"])
+        values = [_decode_value(v) for v in payload["v"]]
+        backwards = bool(payload["b"])
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if types is not None and not all(map(_fits, values, types)):
+        raise ValueError("Malformed cursor")
+    return order, values, backwards
@@ -0,0 +1,36 @@
+import csv
+import io
+import json
+from typing import Any, Iterable, List, Type
+
+from pydantic import BaseModel
+
+
+def to_ndjson(items: Iterable[Any], schema: Type[BaseModel]) -> bytes:
+    """
+    Serialize ORM objects to newline-delimited JSON through `schema`.
+    """
+    return b"".join(
+        schema.model_validate(item).model_dump_json().encode() + b"\n" for item in items
+    )
+
+
+def csv_header(schema: Type[BaseModel]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(schema.model_fields)
+    return buffer.getvalue()
+
+
+def to_csv(items: Iterable[Any], schema: Type[BaseModel]) -> str:
+    """
+    Serialize ORM objects to CSV rows through `schema`. Nested values are
+    written as JSON.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for item in items:
+        row: List[Any] = []
+        for value in schema.model_validate(item).model_dump(mode="json").values():
+            row.append(json.dumps(value) if isinstance(value, (dict, list)) else value)
+        writer.writerow(row)
+    return buffer.getvalue()
@@ -0,0 +1,111 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import Request
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def make_etag(id: Any, updated_at: datetime.datetime) -> str:
+    """
+    Strong validator for one row: the ULID plus its last update time, which
+    every column change bumps. Usable in `If-Match`.
+    """
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=datetime.UTC)
+    return f'"{id}-{(updated_at - _EPOCH) // _MICROSECOND:x}"'
+
+
+def list_etag(items: Iterable[Any], *extra: Any) -> str:
+    """
+    Weak validator for a list response, from every item's `(id, updated_at)`
+    and any page metadata in `extra`.
+    """
+    digest = hashlib.sha1()
+    for item in items:
+        digest.update(f"{item.id}:{item.updated_at.isoformat()};".encode())
+    for value in extra:
+        digest.update(f"|{value}".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def http_date(dt: datetime.datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.UTC)
+    return format_datetime(dt.astimezone(datetime.UTC), usegmt=True)
+
+
+def validator_headers(
+    etag: str, last_modified: Optional[datetime.datetime] = None
+) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of `etag` against an `If-None-Match` / `If-Match` list.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(
+        _strip_weak(candidate.strip()) == _strip_weak(etag)
+        for candidate in header.split(",")
+    )
+
+
+def etag_versions(header: str, id: Any) -> List[datetime.datetime]:
+    """
+    The `updated_at` values carried by those entity tags in an `If-Match` list
+    that `make_etag` issued for `id`; anything else is ignored, weak tags
+    included, as `If-Match` uses strong comparison.
+    """
+    versions = []
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            continue
+        tag_id, _, micros = candidate.strip('"').rpartition("-")
+        if tag_id != str(id):
+            continue
+        try:
+            versions.append(_EPOCH + int(micros, 16) * _MICROSECOND)
+        except ValueError:
+            continue
+    return versions
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime.datetime] = None
+) -> bool:
+    """
+    Evaluate `If-None-Match`, falling back to `If-Modified-Since` only when
+    the former is absent, as RFC 9110 prescribes.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.UTC)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=datetime.UTC)
+        return last_modified.replace(microsecond=0) <= since
+    return False
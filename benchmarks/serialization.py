@@ -0,0 +1,83 @@
+"""Microbenchmark: character list responses, default vs fast-path serialization.
+
+    python -m benchmarks.serialization [--rows 1000] [--repeat 50]
+
+`default` is what FastAPI does for a `response_model` endpoint: validate the
+ORM rows, dump them to Python primitives with `mode="json"` and encode the
+result with `json.dumps`. `fast` validates the same rows and renders the model
+through `ModelResponse`, which serializes straight to JSON bytes.
+"""
+
+import argparse
+import asyncio
+import statistics
+import timeit
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.responses import ModelResponse
+from app.core.ulid_gen import ulid_generator
+from app.models.character import Character as CharacterModel
+from app.schemas.character import Character
+from app.schemas.pagination import KeysetPage
+from app.utils.datetime import utc_now_aware
+
+
+def make_rows(n: int) -> List[CharacterModel]:
+    now = utc_now_aware()
+    return [
+        CharacterModel(
+            id=id,
+            name=f"Character {i}",
+            description=f"Character number {i} " * 4,
+            default_outfit="casual",
+            extra_variables={"mood": "calm", "level": i, "tags": ["a", "b"]},
+            created_at=now,
+            updated_at=now,
+        )
+        for i, id in enumerate(ulid_generator.batch(n))
+    ]
+
+
+def default_pipeline(loop, field, rows) -> bytes:
+    content = loop.run_until_complete(
+        serialize_response(field=field, response_content=rows)
+    )
+    return JSONResponse(content).body
+
+
+def fast_pipeline(rows) -> bytes:
+    return ModelResponse(KeysetPage[Character](items=rows)).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    field = create_model_field(name="Response", type_=KeysetPage[Character])
+    payload = {"items": rows}
+
+    loop = asyncio.new_event_loop()
+
+    results = {}
+    for name, fn in {
+        "default": lambda: default_pipeline(loop, field, payload),
+        "fast": lambda: fast_pipeline(rows),
+    }.items():
+        fn()  # warm up schema caches
+        times = timeit.repeat(fn, number=1, repeat=args.repeat)
+        results[name] = statistics.median(times)
+        print(f"{name:>8}: {results[name] * 1000:8.2f} ms / {args.rows} rows")
+
+    print(f" speedup: {results['default'] / results['fast']:8.2f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark matrix for the ULID storage backends of `app.models.types`.
+
+    python -m benchmarks.storage [--rows 100000] [--lookups 2000] [--keep]
+
+For each storage (`ulid`, `uuid`, `byte`, `char`) a scratch table keyed by
+`ulid_type(storage)` is filled with monotonic ULIDs, then the benchmark reports
+insert throughput, heap and primary key index size, and point-lookup latency.
+Needs the database from `DATABASE_URL` with the pgx_ulid extension installed.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List, get_args
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.codecs import register_ulid_codec
+from app.core.config import settings
+from app.core.ulid_gen import ulid_generator
+from app.models.types import ULIDStorage, ulid_server_default, ulid_type
+
+BATCH_SIZE = 1000
+
+
+def make_table(storage: ULIDStorage) -> sa.Table:
+    return sa.Table(
+        f"bench_ulid_{storage}",
+        sa.MetaData(),
+        sa.Column(
+            "id",
+            ulid_type(storage),
+            primary_key=True,
+            server_default=ulid_server_default(storage),
+        ),
+        sa.Column("payload", sa.String, nullable=False),
+    )
+
+
+def make_engine(storage: ULIDStorage) -> AsyncEngine:
+    engine = create_async_engine(str(settings.DATABASE_URL), poolclass=NullPool)
+    if storage == "ulid":
+        register_ulid_codec(engine)
+    return engine
+
+
+async def run(storage: ULIDStorage, rows: int, lookups: int, keep: bool) -> Dict:
+    engine = make_engine(storage)
+    table = make_table(storage)
+    ids = ulid_generator.batch(rows)
+
+    async with engine.connect() as conn:
+        await conn.run_sync(table.metadata.drop_all)
+        await conn.run_sync(table.metadata.create_all)
+        await conn.commit()
+
+        started = time.perf_counter()
+        for start in range(0, rows, BATCH_SIZE):
+            await conn.execute(
+                table.insert(),
+                [
+                    {"id": id, "payload": "x" * 32}
+                    for id in ids[start : start + BATCH_SIZE]
+                ],
+            )
+        await conn.commit()
+        insert_seconds = time.perf_counter() - started
+
+        await conn.execute(sa.text(f"ANALYZE {table.name}"))
+        heap_bytes, index_bytes = (
+            await conn.execute(
+                sa.select(
+                    sa.func.pg_relation_size(table.name),
+                    sa.func.pg_relation_size(f"{table.name}_pkey"),
+                )
+            )
+        ).one()
+
+        stmt = sa.select(table).where(table.c.id == sa.bindparam("id"))
+        latencies: List[float] = []
+        for id in random.sample(ids, min(lookups, rows)):
+            started = time.perf_counter()
+            (await conn.execute(stmt, {"id": id})).one()
+            latencies.append(time.perf_counter() - started)
+
+        if not keep:
+            await conn.run_sync(table.metadata.drop_all)
+            await conn.commit()
+
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "storage": storage,
+        "insert_rows_per_s": rows / insert_seconds,
+        "heap_mb": heap_bytes / 2**20,
+        "index_mb": index_bytes / 2**20,
+        "lookup_p50_us": statistics.median(latencies) * 1e6,
+        "lookup_p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument(
+        "--storage",
+        action="append",
+        choices=get_args(ULIDStorage),
+        help="Storage to run; repeatable, default all",
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the tables")
+    args = parser.parse_args()
+
+    print(
+        f"{'storage':>8} {'insert/s':>10} {'heap MB':>8} {'index MB':>9}"
+        f" {'p50 us':>8} {'p99 us':>8}"
+    )
+    for storage in args.storage or get_args(ULIDStorage):
+        r = await run(storage, args.rows, args.lookups, args.keep)
+        print(
+            f"{r['storage']:>8} {r['insert_rows_per_s']:>10.0f}"
+            f" {r['heap_mb']:>8.2f} {r['index_mb']:>9.2f}"
+            f" {r['lookup_p50_us']:>8.1f} {r['lookup_p99_us']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,7 @@
 import asyncio
 import uuid
-from typing import Any, AsyncGenerator, Dict, Generator
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Dict, Generator, List
 
 import pytest
 import pytest_asyncio
@@ -14,7 +15,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db, get_read_session_factory
 from app.core.config import settings
 from app.core.security import create_access_token, get_password_hash
 from app.crud.character import character_crud
@@ -105,6 +106,25 @@ async def dbsession(
         await connection.close()
 
 
+@pytest.fixture
+def executed_statements(dbsession: AsyncSession, monkeypatch) -> List[Any]:
+    """
+    Statements executed on `dbsession` from when this fixture is set up on.
+
+    :param dbsession: session to watch.
+    :returns: list the statements are appended to.
+    """
+    statements = []
+    execute = dbsession.execute
+
+    async def counting_execute(statement, *args, **kwargs):
+        statements.append(statement)
+        return await execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(dbsession, "execute", counting_execute)
+    return statements
+
+
 @pytest_asyncio.fixture
 def fastapi_app(
     dbsession: AsyncSession,
@@ -118,6 +138,14 @@ def fastapi_app(
 
     application = get_app()
     application.dependency_overrides[get_db] = lambda: dbsession
+    application.dependency_overrides[get_read_db] = lambda: dbsession
+
+    @asynccontextmanager
+    async def shared_session():
+        # Sessions a handler opens itself see, and leave open, the test's own.
+        yield dbsession
+
+    application.dependency_overrides[get_read_session_factory] = lambda: shared_session
     return application  # noqa: WPS331
 
 
@@ -0,0 +1,588 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import List
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ulid import ULID
+
+from app.core.config import settings
+from app.crud.character import character_crud
+from app.models.character import Character, Disposition
+from app.schemas.character import Character as CharacterSchema, CharacterCreate
+
+
+@pytest_asyncio.fixture(scope="function")
+async def test_characters(dbsession: AsyncSession) -> List[Character]:
+    """
+    Create a handful of characters for list endpoints.
+    """
+    characters = []
+    for i in range(5):
+        character_in = CharacterCreate(
+            name=f"Character {i}",
+            description=f"Character number {i}",
+        )
+        characters.append(await character_crud.create(dbsession, obj_in=character_in))
+    await dbsession.flush()
+    return characters
+
+
+@pytest.mark.asyncio
+async def test_read_characters_cursor_walks_forward_and_back(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test keyset pagination in both directions over the ULID ordering."""
+    expected_ids = sorted(str(c.id) for c in test_characters)
+
+    response = await client.get("/api/v1/characters/cursor", params={"size": 2})
+    assert response.status_code == status.HTTP_200_OK
+    first = response.json()
+    assert [c["id"] for c in first["items"]] == expected_ids[:2]
+    assert first["previous_page"] is None
+    assert first["next_page"]
+
+    response = await client.get(
+        "/api/v1/characters/cursor",
+        params={"size": 2, "cursor": first["next_page"]},
+    )
+    second = response.json()
+    assert [c["id"] for c in second["items"]] == expected_ids[2:4]
+
+    response = await client.get(
+        "/api/v1/characters/cursor",
+        params={"size": 2, "cursor": second["previous_page"]},
+    )
+    assert [c["id"] for c in response.json()["items"]] == expected_ids[:2]
+
+
+@pytest.mark.asyncio
+async def test_read_characters_cursor_custom_order(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test keyset pagination on a custom sort key with the ULID tiebreaker."""
+    expected_names = sorted((c.name for c in test_characters), reverse=True)
+
+    names = []
+    params = {"size": 2, "custom_order_by": "-name"}
+    while True:
+        response = await client.get("/api/v1/characters/cursor", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        names.extend(c["name"] for c in page["items"])
+        if not page["next_page"]:
+            break
+        params["cursor"] = page["next_page"]
+
+    assert names == expected_names
+
+
+@pytest.mark.asyncio
+async def test_read_characters_cursor_rejects_foreign_cursor(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that a cursor cannot be replayed against another ordering."""
+    response = await client.get("/api/v1/characters/cursor", params={"size": 2})
+    cursor = response.json()["next_page"]
+
+    response = await client.get(
+        "/api/v1/characters/cursor",
+        params={"size": 2, "cursor": cursor, "custom_order_by": "-name"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_read_characters_cursor_rejects_forged_values(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that a well-formed cursor with wrong-typed values is a bad request."""
+    for params, order, values in (
+        ({}, ["+id"], [123]),
+        ({}, ["+id"], [True]),
+        ({"custom_order_by": "name"}, ["+name", "+id"], ["Alice", "Bob"]),
+        (
+            {"custom_order_by": "-created_at"},
+            ["-created_at", "-id"],
+            [{"u": str(ULID())}, {"u": str(ULID())}],
+        ),
+    ):
+        forged = base64.urlsafe_b64encode(
+            json.dumps({"o": order, "v": values, "b": False}).encode()
+        ).decode()
+
+        response = await client.get(
+            "/api/v1/characters/cursor",
+            params={"size": 2, **params, "cursor": forged},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_create_characters_bulk_reports_per_row_outcomes(
+    client: AsyncClient, test_character: Character
+):
+    """Test bulk creation skipping names that already exist."""
+    payload = [
+        {"name": "Bulk 1", "description": "first"},
+        {"name": test_character.name, "description": "taken"},
+        {"name": "Bulk 2", "description": "second"},
+    ]
+
+    response = await client.post("/api/v1/characters/bulk", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["created"], data["updated"], data["skipped"]) == (2, 0, 1)
+    assert [row["status"] for row in data["rows"]] == ["created", "skipped", "created"]
+    assert data["rows"][1]["id"] is None
+
+
+@pytest.mark.asyncio
+async def test_upsert_characters_bulk(
+    client: AsyncClient, dbsession: AsyncSession, test_character: Character
+):
+    """Test bulk upsert updating existing names in place, set fields only."""
+    payload = [
+        {"name": test_character.name, "description": "rewritten"},
+        {"name": "Bulk 3", "description": "fresh"},
+    ]
+
+    response = await client.post(
+        "/api/v1/characters/bulk", params={"upsert": True}, json=payload
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    rows = response.json()["rows"]
+    assert rows[0] == {"index": 0, "id": str(test_character.id), "status": "updated"}
+    assert rows[1]["status"] == "created"
+
+    stored = await dbsession.execute(
+        select(
+            Character.description, Character.default_outfit, Character.extra_variables
+        ).where(Character.id == test_character.id)
+    )
+    assert stored.one() == ("rewritten", "Default outfit", {"key": "value"})
+
+
+@pytest.mark.asyncio
+async def test_read_characters_created_window(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test time-window filters rewritten into ULID primary key ranges."""
+    newest = max(c.id for c in test_characters).datetime
+
+    response = await client.get(
+        "/api/v1/characters/cursor",
+        params={"created_before": (newest + timedelta(seconds=1)).isoformat()},
+    )
+    assert len(response.json()["items"]) == len(test_characters)
+
+    response = await client.get(
+        "/api/v1/characters/cursor",
+        params={"created_after": (newest + timedelta(seconds=1)).isoformat()},
+    )
+    assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_read_character_include_dispositions(
+    client: AsyncClient, dbsession: AsyncSession, test_character: Character
+):
+    """Test that dispositions are embedded only on request."""
+    dbsession.add(
+        Disposition(category="temper", trait="calm", character_id=test_character.id)
+    )
+    await dbsession.flush()
+
+    response = await client.get(f"/api/v1/characters/{test_character.id}")
+    assert response.json()["dispositions"] is None
+
+    response = await client.get(
+        f"/api/v1/characters/{test_character.id}",
+        params={"include": "dispositions"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    dispositions = response.json()["dispositions"]
+    assert [d["trait"] for d in dispositions] == ["calm"]
+
+    response = await client.get(
+        f"/api/v1/characters/{test_character.id}", params={"include": "unknown"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_read_characters_batch(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test fetching several characters by ID in request order."""
+    missing_id = str(ULID())
+    ids = [str(test_characters[2].id), missing_id, str(test_characters[0].id)]
+
+    response = await client.post("/api/v1/characters/batch-get", json={"ids": ids})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [c["id"] for c in data["items"]] == [ids[0], ids[2]]
+    assert data["missing"] == [missing_id]
+
+
+@pytest.mark.asyncio
+async def test_read_character_not_modified(
+    client: AsyncClient, test_character: Character
+):
+    """Test that a matching If-None-Match yields 304 without a body."""
+    response = await client.get(f"/api/v1/characters/{test_character.id}")
+    etag = response.headers["etag"]
+    assert response.headers["last-modified"]
+
+    response = await client.get(
+        f"/api/v1/characters/{test_character.id}",
+        headers={"If-None-Match": etag},
+    )
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_update_character_if_match(
+    client: AsyncClient, test_character: Character
+):
+    """Test optimistic concurrency on PUT with If-Match."""
+    response = await client.get(f"/api/v1/characters/{test_character.id}")
+    etag = response.headers["etag"]
+
+    response = await client.put(
+        f"/api/v1/characters/{test_character.id}",
+        headers={"If-Match": etag},
+        json={"description": "first writer"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+    response = await client.put(
+        f"/api/v1/characters/{test_character.id}",
+        headers={"If-Match": etag},
+        json={"description": "second writer"},
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+@pytest.mark.asyncio
+async def test_update_character_if_match_is_strong(
+    client: AsyncClient, test_character: Character
+):
+    """Test that a weak If-Match tag never matches, even the current one."""
+    response = await client.get(f"/api/v1/characters/{test_character.id}")
+    etag = response.headers["etag"]
+    assert not etag.startswith("W/")
+
+    response = await client.put(
+        f"/api/v1/characters/{test_character.id}",
+        headers={"If-Match": f"W/{etag}"},
+        json={"description": "weakly matched"},
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+@pytest.mark.asyncio
+async def test_update_character_missing(client: AsyncClient):
+    """Test that PUT on an unknown ID is a 404, with or without If-Match."""
+    url = f"/api/v1/characters/{ULID()}"
+
+    response = await client.put(url, json={"description": "nobody"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await client.put(
+        url, headers={"If-Match": 'W/"x-1"'}, json={"description": "nobody"}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_delete_character(client: AsyncClient, test_character: Character):
+    """Test that DELETE removes the character and a second DELETE is a 404."""
+    url = f"/api/v1/characters/{test_character.id}"
+
+    response = await client.delete(url)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    response = await client.delete(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_delete_characters_bulk(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test bulk DELETE by ID list, and that it refuses an empty selection."""
+    response = await client.delete("/api/v1/characters/")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    ids = [str(character.id) for character in test_characters[:2]]
+    response = await client.delete(
+        "/api/v1/characters/", params={"ids": ids + [str(ULID())]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"deleted": 2}
+
+    response = await client.post("/api/v1/characters/batch-get", json={"ids": ids})
+    assert response.json()["missing"] == ids
+
+
+@pytest.mark.asyncio
+async def test_delete_characters_refuses_blank_filters(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that filters restricting nothing cannot delete every character."""
+    for params in (
+        {"custom_search": ""},
+        {"extra_has_keys": ","},
+        {"extra_has_keys": " "},
+    ):
+        response = await client.delete(
+            "/api/v1/characters/", params={**params, "hard": True}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = await client.delete(
+        "/api/v1/characters/", params={"custom_order_by": "-name"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await client.get("/api/v1/characters/")
+    assert response.json()["total"] == len(test_characters)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_names_conflict(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that creating or renaming onto a taken name is a 409."""
+    response = await client.post(
+        "/api/v1/characters/",
+        json={"name": test_characters[0].name, "description": "imposter"},
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = await client.put(
+        f"/api/v1/characters/{test_characters[1].id}",
+        json={"name": test_characters[0].name},
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+@pytest.mark.asyncio
+async def test_read_characters_search(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that custom_search matches whole words of the name."""
+    response = await client.get(
+        "/api/v1/characters/", params={"custom_search": "character 3"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["name"] for item in response.json()["items"]] == ["Character 3"]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def fellowship(dbsession: AsyncSession) -> List[Character]:
+    """
+    Characters with near-miss names for the search engines.
+    """
+    return [
+        await character_crud.create(
+            dbsession, obj_in=CharacterCreate(name=name, description="")
+        )
+        for name in ("Aragorn", "Legolas", "Aragon", "Boromir")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_characters_search_ilike(
+    client: AsyncClient, fellowship: List[Character], monkeypatch
+):
+    """Test that the ilike engine matches case-insensitive substrings only."""
+    monkeypatch.setattr(settings, "SEARCH_ENGINE", "ilike")
+
+    response = await client.get("/api/v1/characters/", params={"custom_search": "RAG"})
+    assert response.status_code == status.HTTP_200_OK
+    assert {item["name"] for item in response.json()["items"]} == {
+        "Aragorn",
+        "Aragon",
+    }
+
+    response = await client.get(
+        "/api/v1/characters/", params={"custom_search": "aragorm"}
+    )
+    assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_read_characters_search_trigram(
+    client: AsyncClient, fellowship: List[Character], monkeypatch
+):
+    """Test that the trigram engine tolerates a typo and ranks closer first."""
+    monkeypatch.setattr(settings, "SEARCH_ENGINE", "trigram")
+
+    response = await client.get(
+        "/api/v1/characters/", params={"custom_search": "aragon"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    # "Aragorn" only matches fuzzily, below the exact word.
+    assert [item["name"] for item in response.json()["items"]] == [
+        "Aragon",
+        "Aragorn",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_characters_extra_variables(
+    client: AsyncClient, dbsession: AsyncSession
+):
+    """Test containment, key existence and path filters on extra_variables."""
+    for name, extra in [
+        ("Calm", {"mood": "calm", "profile": {"age": 30}}),
+        ("Angry", {"mood": "angry", "profile": {"age": 31}, "scar": None}),
+        ("Plain", None),
+    ]:
+        await character_crud.create(
+            dbsession,
+            obj_in=CharacterCreate(name=name, description=name, extra_variables=extra),
+        )
+
+    async def names(**params):
+        response = await client.get("/api/v1/characters/", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        return sorted(item["name"] for item in response.json()["items"])
+
+    assert await names(extra_contains='{"mood": "calm"}') == ["Calm"]
+    assert await names(extra_has_keys="mood,scar") == ["Angry"]
+    assert await names(extra_path="profile.age=31") == ["Angry"]
+    assert await names(extra_path="mood=calm") == ["Calm"]
+
+    response = await client.get(
+        "/api/v1/characters/", params={"extra_contains": "{not json"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_read_characters_count_modes(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that each count mode is reported and agrees on has_next."""
+
+    async def page(number: int, count: str) -> dict:
+        response = await client.get(
+            "/api/v1/characters/",
+            params={"page": number, "size": 2, "count": count},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    for count in ("exact", "estimated", "cached", "none"):
+        first, last = await page(1, count), await page(3, count)
+        assert first["count_mode"] == count
+        assert first["has_next"] is True
+        assert first["links"]["next"] is not None
+        assert last["has_next"] is False
+        assert last["links"]["next"] is None
+        if count == "none":
+            assert first["total"] is None
+            assert first["links"]["last"] is None
+        else:
+            # Approximate totals are pinned down once the last page is seen.
+            assert last["total"] == len(test_characters)
+
+
+@pytest.mark.asyncio
+async def test_read_characters_last_modified(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that a page's Last-Modified is its latest update."""
+    response = await client.get("/api/v1/characters/", params={"size": 2})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"]
+    latest = max(c["updated_at"] for c in response.json()["items"])
+    assert parsedate_to_datetime(
+        response.headers["last-modified"]
+    ) == datetime.fromisoformat(latest).replace(microsecond=0)
+
+
+@pytest.mark.asyncio
+async def test_read_characters_reuses_statements_per_shape(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that requests of one filter shape share a statement, not values."""
+    hits = character_crud.statements.stats()["hits"]
+
+    for character in test_characters[:3]:
+        for path in ("/api/v1/characters/", "/api/v1/characters/cursor"):
+            response = await client.get(path, params={"name": character.name})
+            assert response.status_code == status.HTTP_200_OK
+            assert [item["id"] for item in response.json()["items"]] == [
+                str(character.id)
+            ]
+
+    assert character_crud.statements.stats()["hits"] > hits
+
+
+@pytest.mark.asyncio
+async def test_export_characters_ndjson(
+    client: AsyncClient, test_characters: List[Character]
+):
+    """Test that the NDJSON export streams every match, by ID, one per line."""
+    response = await client.get("/api/v1/characters/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == sorted(str(c.id) for c in test_characters)
+
+    response = await client.get(
+        "/api/v1/characters/export", params={"name": "Character 2"}
+    )
+    assert [json.loads(line)["name"] for line in response.text.splitlines()] == [
+        "Character 2"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_characters_csv(client: AsyncClient, dbsession: AsyncSession):
+    """Test the CSV export's header, quoting and nested values."""
+    character = await character_crud.create(
+        dbsession,
+        obj_in=CharacterCreate(
+            name="Quoted",
+            description='Says "hi", then\nleaves',
+            extra_variables={"mood": "calm"},
+        ),
+    )
+
+    response = await client.get(
+        "/api/v1/characters/export", params={"format": "csv", "name": "Quoted"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert header == list(CharacterSchema.model_fields)
+    assert len(rows) == 1
+    row = dict(zip(header, rows[0]))
+    assert row["id"] == str(character.id)
+    assert row["description"] == 'Says "hi", then\nleaves'
+    assert json.loads(row["extra_variables"]) == {"mood": "calm"}
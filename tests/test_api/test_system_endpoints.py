@@ -0,0 +1,47 @@
+import re
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_read_pool_stats(client: AsyncClient):
+    """Test that pool usage is reported."""
+    response = await client.get("/api/v1/system/pool")
+
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data["checked_out"] >= 0
+    assert data["overflow"] >= 0
+    assert "wait_max_seconds" in data
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_statements_per_endpoint(
+    client: AsyncClient, test_character
+):
+    """Test the Server-Timing header and the per-endpoint metrics."""
+    endpoint = '{endpoint="GET /api/v1/characters/{character_id}"}'
+    response = await client.get(f"/api/v1/characters/{test_character.id}")
+    timing = re.fullmatch(
+        r'db;dur=[\d.]+;desc="(\d+) queries"(, db-slowest;dur=[\d.]+)?',
+        response.headers["server-timing"],
+    )
+    assert timing is not None
+    assert int(timing.group(1)) >= 1
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f"http_requests_total{endpoint}" in response.text
+    statements = re.search(
+        rf"^db_statements_total{re.escape(endpoint)} (\d+)$",
+        response.text,
+        re.MULTILINE,
+    )
+    assert statements is not None
+    assert int(statements.group(1)) > 0
+    assert "db_pool_checked_out " in response.text
@@ -0,0 +1,95 @@
+from unittest import mock
+
+import pytest
+from ulid import ULID
+
+from app.core.cache import (
+    CacheInvalidationListener,
+    TTLCache,
+    apply_invalidation,
+    invalidation_payload,
+    register_cache,
+)
+
+
+@pytest.fixture
+def table_cache(monkeypatch) -> TTLCache:
+    """
+    Cache registered as `test_table`, in a registry of the test's own, so
+    neither it nor what the test does to every cache outlives the test.
+    """
+    monkeypatch.setattr("app.core.cache._caches", {})
+    cache = TTLCache()
+    register_cache("test_table", cache)
+    return cache
+
+
+def test_lru_eviction_and_counters():
+    """Test that the least recently used entry is evicted first."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_entries_expire_after_ttl():
+    """Test that entries are dropped once their TTL has passed."""
+    cache = TTLCache(maxsize=2, ttl=10)
+    with mock.patch("app.core.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with mock.patch("app.core.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+
+    assert cache.expirations == 1
+
+
+def test_apply_invalidation_routes_by_table(table_cache: TTLCache):
+    """Test that a notification payload drops the listed IDs."""
+    kept, dropped = ULID(), ULID()
+    table_cache.set(("id", kept), {})
+    table_cache.set(("id", dropped), {})
+
+    apply_invalidation(invalidation_payload("test_table", [dropped]))
+
+    assert table_cache.get(("id", dropped)) is None
+    assert table_cache.get(("id", kept)) == {}
+
+
+def test_apply_invalidation_flushes_the_table(table_cache: TTLCache):
+    """Test that a payload without IDs drops the table's whole cache."""
+    table_cache.set(("id", ULID()), {})
+    table_cache.set(("name", "a"), ULID())
+
+    apply_invalidation(invalidation_payload("test_table"))
+
+    assert table_cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_and_bypasses_caches_meanwhile(
+    table_cache: TTLCache,
+):
+    """Test that caches are off while the listener is lost, and back after."""
+    table_cache.set(("id", ULID()), {})
+    connection = mock.MagicMock(add_listener=mock.AsyncMock())
+    connect = mock.AsyncMock(side_effect=[OSError("refused"), connection])
+    listener = CacheInvalidationListener("postgresql://", "channel")
+
+    with (
+        mock.patch("app.core.cache.asyncpg.connect", connect),
+        mock.patch("app.core.cache.asyncio.sleep", mock.AsyncMock()),
+    ):
+        listener._on_termination(None)
+        assert not table_cache.enabled
+        assert table_cache.stats()["size"] == 0
+        await listener._reconnect
+
+    assert table_cache.enabled
+    assert connect.await_count == 2
+    connection.add_termination_listener.assert_called_once()
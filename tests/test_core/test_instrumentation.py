@@ -0,0 +1,54 @@
+import pytest
+
+from app.core.instrumentation import (
+    QueryStatsMiddleware,
+    current_query_stats,
+    normalize_sql,
+    render_metrics,
+)
+
+
+def test_normalize_sql():
+    """Test that literals and IN lists are folded and whitespace collapsed."""
+    statement = """
+        SELECT character.id FROM character
+        WHERE character.name = 'O''Brien' AND character.id IN ($1, $2, $3)
+        LIMIT 10 OFFSET $4
+    """
+
+    assert normalize_sql(statement) == (
+        "SELECT character.id FROM character "
+        "WHERE character.name = ? AND character.id IN (...) LIMIT ? OFFSET $4"
+    )
+
+
+class _Route:
+    path = "/things/{id}"
+
+
+async def _app(scope, receive, send):
+    scope["route"] = _Route()
+    stats = current_query_stats()
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT pg_sleep(0.01)", 0.010)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+@pytest.mark.asyncio
+async def test_middleware_reports_request_statements():
+    """Test the Server-Timing header and per-endpoint totals of a request."""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/things/1"}
+    await QueryStatsMiddleware(_app)(scope, None, send)
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"server-timing"] == (
+        b'db;dur=12.00;desc="2 queries", db-slowest;dur=10.00'
+    )
+    assert current_query_stats() is None
+    assert 'db_statements_total{endpoint="GET /things/{id}"} 2' in render_metrics()
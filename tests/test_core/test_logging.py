@@ -0,0 +1,120 @@
+from unittest import mock
+
+import pytest
+from loguru import logger
+
+from app.core.logging import (
+    RequestContextMiddleware,
+    _patch,
+    configure_logging,
+    current_request_id,
+    debug_enabled,
+)
+
+
+@pytest.fixture
+def records():
+    lines = []
+    configure_logging("INFO", sink=lines.append, tracing=True)
+    yield lines
+    configure_logging()
+
+
+def _app(observed):
+    async def app(scope, receive, send):
+        observed.append((current_request_id(), debug_enabled()))
+        logger.debug("debug line")
+        logger.info("info line")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+async def _request(middleware, headers=()):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": list(headers)}
+    await middleware(scope, None, send)
+    return dict(messages[0]["headers"])
+
+
+@pytest.mark.asyncio
+async def test_request_id_generated_and_echoed(records):
+    """Test that a request without an ID gets one, logged and echoed back."""
+    observed = []
+    headers = await _request(RequestContextMiddleware(_app(observed)))
+
+    request_id = observed[0][0]
+    assert len(request_id) == 26
+    assert headers[b"x-request-id"] == request_id.encode()
+    assert f"| {request_id} |" in records[0]
+    assert current_request_id() is None
+
+
+@pytest.mark.asyncio
+async def test_request_id_from_client(records):
+    """Test that a well-formed client ID is kept and a malformed one replaced."""
+    observed = []
+    middleware = RequestContextMiddleware(_app(observed))
+
+    headers = await _request(middleware, [(b"x-request-id", b"abc-123")])
+    assert headers[b"x-request-id"] == b"abc-123"
+
+    headers = await _request(middleware, [(b"x-request-id", b"a\nb")])
+    assert headers[b"x-request-id"] != b"a\nb"
+
+
+@pytest.mark.asyncio
+async def test_debug_is_off_unless_traced(records):
+    """Test that DEBUG records are dropped for untraced requests."""
+    observed = []
+    await _request(RequestContextMiddleware(_app(observed), trace_token="s3cret"))
+
+    assert observed[0][1] is False
+    assert len(records) == 1
+    assert "info line" in records[0]
+
+
+@pytest.mark.asyncio
+async def test_debug_trace_header(records):
+    """Test that the trace header enables DEBUG for that request only."""
+    observed = []
+    middleware = RequestContextMiddleware(_app(observed), trace_token="s3cret")
+
+    await _request(middleware, [(b"x-debug-trace", b"s3cret")])
+    await _request(middleware, [(b"x-debug-trace", b"wrong")])
+
+    assert [traced for _, traced in observed] == [True, False]
+    assert [line for line in records if "debug line" in line] == [records[0]]
+    assert not debug_enabled()
+
+
+@pytest.mark.asyncio
+async def test_debug_trace_sampling(records):
+    """Test that every request is traced at a sample rate of 1."""
+    observed = []
+    await _request(RequestContextMiddleware(_app(observed), trace_sample_rate=1.0))
+
+    assert observed[0][1] is True
+    assert any("debug line" in line for line in records)
+
+
+def test_debug_calls_skipped_without_tracing():
+    """Test that without tracing, DEBUG calls stop before a record is built."""
+    lines = []
+    configure_logging("INFO", sink=lines.append, tracing=False)
+    patcher = mock.Mock(side_effect=_patch)
+    logger.configure(patcher=patcher)
+    try:
+        logger.debug("debug line")
+        patcher.assert_not_called()
+
+        logger.info("info line")
+        patcher.assert_called_once()
+        assert len(lines) == 1
+    finally:
+        configure_logging()
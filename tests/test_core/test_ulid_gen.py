@@ -0,0 +1,64 @@
+import datetime
+from unittest import mock
+
+from app.core.ulid_gen import MAX_RANDOMNESS, ULIDGenerator, max_ulid_for, min_ulid_for
+
+
+def test_next_is_strictly_increasing():
+    """Test that IDs within the same millisecond keep increasing."""
+    generator = ULIDGenerator()
+
+    ids = [generator.next() for _ in range(1000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_batch_increments_random_part_within_a_millisecond():
+    """Test that a batch in one millisecond differs only by +1 steps."""
+    generator = ULIDGenerator()
+
+    with mock.patch(
+        "app.core.ulid_gen.time.time_ns", return_value=1_700_000_000 * 10**9
+    ):
+        ids = generator.batch(3)
+
+    assert len({u.milliseconds for u in ids}) == 1
+    assert int(ids[1]) - int(ids[0]) == 1
+    assert int(ids[2]) - int(ids[1]) == 1
+
+
+def test_clock_going_backwards_stays_monotonic():
+    """Test that a wall clock step back does not break ordering."""
+    generator = ULIDGenerator()
+
+    with mock.patch("app.core.ulid_gen.time.time_ns") as time_ns:
+        time_ns.return_value = 2_000 * 10**6
+        first = generator.next()
+        time_ns.return_value = 1_000 * 10**6
+        second = generator.next()
+
+    assert second > first
+    assert second.milliseconds == first.milliseconds
+
+
+def test_random_overflow_borrows_next_millisecond():
+    """Test that exhausting the random part rolls over to the next millisecond."""
+    generator = ULIDGenerator()
+
+    with mock.patch("app.core.ulid_gen.time.time_ns", return_value=5_000 * 10**6):
+        first = generator.next()
+        generator._last_random = MAX_RANDOMNESS
+        second = generator.next()
+
+    assert second > first
+    assert second.milliseconds == first.milliseconds + 1
+
+
+def test_bounds_before_the_epoch_clamp_to_it():
+    """Test that pre-1970 times give the epoch's bounds rather than raising."""
+    dt = datetime.datetime(1960, 1, 1, tzinfo=datetime.UTC)
+
+    assert min_ulid_for(dt).bytes == bytes(16)
+    assert max_ulid_for(dt) == max_ulid_for(datetime.datetime(1970, 1, 1))
+    assert int(max_ulid_for(dt)) == MAX_RANDOMNESS
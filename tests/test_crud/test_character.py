@@ -0,0 +1,167 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, List
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from ulid import ULID
+
+from app.core.cache import TTLCache
+from app.crud.base import DuplicateRecordError
+from app.crud.character import character_crud
+from app.models.character import Character
+from app.schemas.character import CharacterCreate
+from app.utils.datetime import utc_now_aware
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_are_coalesced(
+    dbsession: AsyncSession,
+    test_character: Character,
+    executed_statements: List[Any],
+):
+    """Test that concurrent gets on one session share a single query."""
+    found, missing, again = await asyncio.gather(
+        character_crud.get(dbsession, id=test_character.id),
+        character_crud.get(dbsession, id=ULID()),
+        character_crud.get(dbsession, id=test_character.id),
+    )
+
+    assert found is test_character
+    assert again is test_character
+    assert missing is None
+    assert len(executed_statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_accepts_any_id_form(
+    dbsession: AsyncSession, test_character: Character
+):
+    """Test that get finds a record by its ID as a string or UUID too."""
+    for id in (str(test_character.id), test_character.id.to_uuid()):
+        assert await character_crud.get(dbsession, id=id) is test_character
+
+
+@pytest.mark.asyncio
+async def test_update_by_id_is_one_statement(
+    dbsession: AsyncSession,
+    test_character: Character,
+    executed_statements: List[Any],
+):
+    """Test that update_by_id writes and reads back in a single statement."""
+    version = test_character.updated_at
+
+    updated = await character_crud.update_by_id(
+        dbsession,
+        id=test_character.id,
+        obj_in={"description": "rewritten"},
+        if_updated_at=[version],
+    )
+
+    assert updated is test_character
+    assert updated.description == "rewritten"
+    assert updated.updated_at > version
+    assert len(executed_statements) == 1
+
+    stale = await character_crud.update_by_id(
+        dbsession,
+        id=test_character.id,
+        obj_in={"description": "lost update"},
+        if_updated_at=[version],
+    )
+    assert stale is None
+
+
+def test_keyset_order_rejects_nullable_and_relationship_fields():
+    """Test that cursors only order by non-nullable columns, then the ID."""
+    assert character_crud._keyset_order(["-name"]) == [("name", True), ("id", True)]
+
+    for field in ("default_outfit", "dispositions", "nonexistent"):
+        with pytest.raises(ValueError):
+            character_crud._keyset_order([field])
+
+
+@pytest.mark.asyncio
+async def test_delete_is_one_statement(
+    dbsession: AsyncSession,
+    test_character: Character,
+    executed_statements: List[Any],
+):
+    """Test that delete removes a record in one statement and reports misses."""
+    assert await character_crud.delete(dbsession, id=test_character.id)
+    assert len(executed_statements) == 1
+    assert not await character_crud.delete(dbsession, id=test_character.id)
+
+
+@pytest.mark.asyncio
+async def test_delete_where_past_a_payload_flushes_the_cache(
+    dbsession: AsyncSession, test_character: Character, monkeypatch
+):
+    """Test that deleting more IDs than one notification holds flushes the table."""
+    monkeypatch.setattr("app.crud.base.NOTIFY_IDS_PER_PAYLOAD", 1)
+    monkeypatch.setattr(character_crud, "cache", TTLCache())
+    doomed = [
+        await character_crud.create(
+            dbsession, obj_in=CharacterCreate(name=f"Doomed {i}", description="")
+        )
+        for i in range(3)
+    ]
+    for character in [test_character, *doomed]:
+        await character_crud.get(dbsession, id=character.id)
+    assert character_crud.cache.stats()["size"] == 4
+
+    deleted = await character_crud.delete_where(
+        dbsession, Character.name.in_([c.name for c in doomed])
+    )
+
+    assert deleted == 3
+    assert character_crud.cache.stats()["size"] == 0
+    for character in doomed:
+        assert await character_crud.get(dbsession, id=character.id) is None
+    assert await character_crud.get(dbsession, id=test_character.id) is not None
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_hides_and_frees_name(
+    dbsession: AsyncSession, test_character: Character
+):
+    """Test that a soft-deleted character is hidden and its name reusable."""
+    assert await character_crud.quasi_delete(dbsession, id=test_character.id)
+    dbsession.expunge_all()
+
+    assert await character_crud.get(dbsession, id=test_character.id) is None
+    assert await character_crud.get_by_name(dbsession, name=test_character.name) is None
+    assert not await character_crud.quasi_delete(dbsession, id=test_character.id)
+
+    replacement = await character_crud.create(
+        dbsession,
+        obj_in=CharacterCreate(name=test_character.name, description="again"),
+    )
+    assert replacement.id != test_character.id
+
+
+@pytest.mark.asyncio
+async def test_purge_deleted(dbsession: AsyncSession, test_character: Character):
+    """Test that purging hard-deletes tombstones older than the cutoff only."""
+    await character_crud.quasi_delete(dbsession, id=test_character.id)
+
+    before = utc_now_aware() - timedelta(days=1)
+    assert await character_crud.purge_deleted(dbsession, before=before) == []
+
+    before = utc_now_aware() + timedelta(seconds=1)
+    purged = await character_crud.purge_deleted(dbsession, before=before)
+    assert purged == [test_character.id]
+
+
+@pytest.mark.asyncio
+async def test_create_duplicate_name(
+    dbsession: AsyncSession, test_character: Character
+):
+    """Test that a duplicate create raises without aborting the transaction."""
+    with pytest.raises(DuplicateRecordError):
+        await character_crud.create(
+            dbsession,
+            obj_in=CharacterCreate(name=test_character.name, description="again"),
+        )
+
+    assert await character_crud.get(dbsession, id=test_character.id) is not None
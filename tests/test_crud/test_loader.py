@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.crud.loader import DataLoader
+
+
+@pytest.mark.asyncio
+async def test_loads_within_a_tick_share_a_batch():
+    """Test that keys loaded together are fetched in one call, deduplicated."""
+    batches = []
+
+    async def batch_load(keys):
+        batches.append(keys)
+        return {key: key * 2 for key in keys}
+
+    loader = DataLoader(batch_load)
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1))
+
+    assert results == [2, 4, 2]
+    assert batches == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_every_caller():
+    """Test that an error in the batch function reaches each waiting caller."""
+
+    async def batch_load(keys):
+        raise RuntimeError("boom")
+
+    loader = DataLoader(batch_load)
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_cancels_every_caller():
+    """Test that cancelling a dispatch does not leave callers waiting."""
+    started = asyncio.Event()
+
+    async def batch_load(keys):
+        started.set()
+        await asyncio.Event().wait()
+
+    loader = DataLoader(batch_load)
+    first, second = loader.load(1), loader.load(2)
+    await started.wait()
+    for task in list(loader._tasks):
+        task.cancel()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(first, second, return_exceptions=True), timeout=1
+    )
+    assert [type(result) for result in results] == [
+        asyncio.CancelledError,
+        asyncio.CancelledError,
+    ]
@@ -0,0 +1,31 @@
+import pytest
+import sqlalchemy as sa
+
+from app.crud.statements import StatementCache
+
+table = sa.table("note", sa.column("id"), sa.column("text"))
+
+
+def test_statement_built_once_per_shape():
+    """Test that a shape's statement is built on first use, then reused."""
+    cache = StatementCache()
+    built = []
+
+    def build():
+        built.append(1)
+        return sa.select(table).where(table.c.text == sa.bindparam("text"))
+
+    first = cache.get(("text",), build, ["text"])
+
+    assert cache.get(("text",), build, ["text"]) is first
+    assert len(built) == 1
+
+
+def test_statement_with_unnamed_values_rejected():
+    """Test that a statement baking in a value is not cached for reuse."""
+    cache = StatementCache()
+
+    with pytest.raises(ValueError, match="unnamed values"):
+        cache.get(("text",), lambda: sa.select(table).where(table.c.text == "x"))
+
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from app.models.mixins import SoftDeleteMixin, live_rows
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Note(SoftDeleteMixin, _Base):
+    __tablename__ = "note"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    text: Mapped[str]
+
+
+@pytest.fixture
+def session():
+    engine = sa.create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Note(id=1, text="live"),
+                Note(id=2, text="dead", deleted_at=datetime.datetime(2025, 1, 1)),
+            ]
+        )
+        session.commit()
+        yield session
+
+
+def test_reads_skip_tombstones(session):
+    """Test that selects, including counts over subqueries, see live rows only."""
+    assert session.scalars(sa.select(Note.id)).all() == [1]
+    assert session.scalar(sa.select(Note.id).where(Note.id == 2)) is None
+
+    inner = sa.select(Note).subquery()
+    assert session.scalar(sa.select(sa.func.count()).select_from(inner)) == 1
+
+
+def test_include_deleted(session):
+    """Test that the `include_deleted` execution option lifts the scoping."""
+    query = sa.select(Note.id).order_by(Note.id)
+
+    ids = session.scalars(query, execution_options={"include_deleted": True})
+
+    assert ids.all() == [1, 2]
+
+
+def test_writes_skip_tombstones(session):
+    """Test that ORM updates and deletes leave tombstones alone."""
+    updated = session.scalars(
+        sa.update(Note).values(text="edited").returning(Note.id)
+    ).all()
+    deleted = session.scalars(sa.delete(Note).returning(Note.id)).all()
+
+    assert updated == [1]
+    assert deleted == [1]
+    assert session.scalars(
+        sa.select(Note.text), execution_options={"include_deleted": True}
+    ).all() == ["dead"]
+
+
+def test_live_rows(session):
+    """Test that a statement scoped up front sees live rows only, once reused."""
+    query = live_rows(sa.select(Note.id).where(Note.text == sa.bindparam("text")))
+
+    assert session.scalars(query, {"text": "live"}).all() == [1]
+    assert session.scalars(query, {"text": "dead"}).all() == []
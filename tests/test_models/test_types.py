@@ -0,0 +1,142 @@
+import uuid
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.dialects.sqlite import dialect as sqlite_dialect
+from ulid import ULID
+
+from app.models.types import (
+    DifferedULIDType,
+    ULIDType,
+    UserDefinedULIDType,
+    ulid_server_default,
+    ulid_type,
+)
+from app.models.types_experiments import Ulid
+
+
+@pytest.fixture
+def dialect():
+    return asyncpg_dialect()
+
+
+@pytest.mark.parametrize(
+    "storage, db_value",
+    [
+        ("uuid", lambda u: u.to_uuid()),
+        ("byte", lambda u: u.bytes),
+        ("char", str),
+    ],
+)
+def test_differed_round_trip(dialect, storage, db_value):
+    """Test that each storage converts to its column value and back."""
+    value = ULID()
+    type_ = ulid_type(storage).dialect_impl(dialect)
+
+    bound = type_.bind_processor(dialect)(value)
+    assert bound == db_value(value)
+    assert type_.bind_processor(dialect)(str(value)) == bound
+    assert type_.result_processor(dialect, None)(bound) == value
+
+
+@pytest.mark.parametrize(
+    "storage, column_spec",
+    [("ulid", "ulid"), ("uuid", "UUID"), ("byte", "BYTEA"), ("char", "CHAR(26)")],
+)
+def test_storage_column_spec(dialect, storage, column_spec):
+    """Test the DDL and server default emitted for each storage."""
+    table = sa.Table(
+        "t",
+        sa.MetaData(),
+        sa.Column(
+            "id",
+            ulid_type(storage),
+            primary_key=True,
+            server_default=ulid_server_default(storage),
+        ),
+    )
+
+    ddl = str(sa.schema.CreateTable(table).compile(dialect=dialect))
+    assert f"id {column_spec} DEFAULT " in ddl
+    assert "gen_ulid()" in ddl
+
+
+def test_literal_binds(dialect):
+    """Test that literals are rendered as typed SQL constants."""
+    value = ULID()
+
+    assert UserDefinedULIDType().literal_processor(dialect)(value) == (
+        f"'{value}'::ulid"
+    )
+    assert DifferedULIDType("uuid").literal_processor(dialect)(value) == (
+        f"'{value.to_uuid()}'::uuid"
+    )
+    assert DifferedULIDType("byte").literal_processor(dialect)(value) == (
+        f"'\\x{value.hex}'::bytea"
+    )
+
+
+def test_uuid_result_accepts_driver_uuid(dialect):
+    """Test that any UUID object exposing `.bytes` is read back."""
+    value = ULID()
+    process = DifferedULIDType("uuid").result_processor(dialect, None)
+
+    assert process(uuid.UUID(bytes=value.bytes)) == value
+
+
+def test_rejects_unknown_storage():
+    """Test that an unsupported column type is refused up front."""
+    with pytest.raises(ValueError):
+        DifferedULIDType("text")
+
+
+def test_ulid_type_compiles_per_dialect(dialect):
+    """Test that `Ulid` is `ulid` on Postgres and `CHAR(26)` elsewhere."""
+    table = sa.Table(
+        "t",
+        sa.MetaData(),
+        sa.Column("id", Ulid(), primary_key=True),
+        sa.Column("other", Ulid(native_ulid=False)),
+    )
+
+    postgres = str(sa.schema.CreateTable(table).compile(dialect=dialect))
+    sqlite = str(sa.schema.CreateTable(table).compile(dialect=sqlite_dialect()))
+
+    assert "id ulid NOT NULL" in postgres
+    assert "other CHAR(26)" in postgres
+    assert "id CHAR(26) NOT NULL" in sqlite
+
+
+def test_ulid_type_skips_processors_with_codec(dialect):
+    """Test that no per-value work is done once the driver decodes ULIDs."""
+    type_ = Ulid().dialect_impl(dialect)
+    assert type_.result_processor(dialect, None) is not None
+
+    dialect.supports_native_ulid = True
+
+    assert type_.bind_processor(dialect) is None
+    assert type_.result_processor(dialect, None) is None
+
+
+def test_ulid_type_types_any_binds(dialect):
+    """Test that `column == any_(bindparam)` binds an array of the column type."""
+    ids = [ULID(), ULID()]
+    table = sa.table("t", sa.column("id", Ulid()))
+
+    compiled = (table.c.id == sa.any_(sa.bindparam("ids", ids))).compile(
+        dialect=dialect
+    )
+
+    assert str(compiled) == "t.id = ANY ($1::ulid[])"
+    bind_type = compiled.binds["ids"].type
+    process = bind_type.dialect_impl(dialect).bind_processor(dialect)
+    assert process(ids) == [str(id) for id in ids]
+
+
+def test_migrations_type_ignores_storage(monkeypatch):
+    """Test that the type named by migrations stays `ulid` in any storage."""
+    monkeypatch.setattr("app.models.types.settings.ULID_STORAGE", "uuid")
+
+    assert isinstance(ULIDType(), UserDefinedULIDType)
+    assert isinstance(ulid_type(), DifferedULIDType)
@@ -0,0 +1,53 @@
+import pytest
+from pydantic import BaseModel, ValidationError
+from ulid import ULID as _python_ULID
+
+from app.core.responses import ModelResponse
+from app.schemas.ulid import ULID
+
+
+class Item(BaseModel):
+    id: ULID
+
+
+@pytest.mark.parametrize("convert", [lambda u: u, str, int, lambda u: u.bytes])
+def test_validates_python_inputs(convert):
+    """Test that every supported input becomes a python-ulid ULID."""
+    value = _python_ULID()
+    assert Item(id=convert(value)).id == value
+
+
+def test_validates_json_strings():
+    """Test that JSON input is validated from its string form."""
+    value = _python_ULID()
+    assert Item.model_validate_json(f'{{"id": "{value}"}}').id == value
+
+
+@pytest.mark.parametrize("value", ["not-a-ulid", 1.5, None])
+def test_rejects_unrecognized_input(value):
+    """Test that invalid input reports a single `ulid_format` error."""
+    with pytest.raises(ValidationError) as exc_info:
+        Item(id=value)
+
+    assert [e["type"] for e in exc_info.value.errors()] == ["ulid_format"]
+
+
+@pytest.mark.parametrize("value", [0, 1 << 127, (1 << 128) - 1, None])
+def test_serializes_like_python_ulid(value):
+    """Test that the serializer matches `str(ulid)` at the edges."""
+    ulid = _python_ULID() if value is None else _python_ULID.from_int(value)
+    item = Item(id=ulid)
+
+    assert item.model_dump_json() == f'{{"id":"{ulid}"}}'
+    assert item.model_dump() == {"id": ulid}
+
+
+def test_model_response_renders_json_bytes():
+    """Test that models are rendered without the `jsonable_encoder` pass."""
+    item = Item(id=_python_ULID())
+
+    response = ModelResponse(item, headers={"ETag": 'W/"x"'})
+
+    assert response.body == item.model_dump_json().encode()
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == 'W/"x"'